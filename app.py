@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import ast
 import re
+import uuid
+
+from recipe_engine import (
+    DEFAULT_DATA_PATH, DEFAULT_OPTIONS, EXPORT_FORMATS, RecipeEngine, metrics, session_nbytes,
+)
+from recipe_engine.perf_metrics import SIZE_BUCKETS
 
 ## --- Configuration and Initial Setup ---
 st.set_page_config(layout="wide", page_title="Chef's Compass")
@@ -11,7 +16,30 @@ st.set_page_config(layout="wide", page_title="Chef's Compass")
 # Load Data Configuration
 # -------------------------------------------------
 # CORRECTED: Using a relative path that works locally and on deployment
-DATA_PATH = 'data/deduplicated_recipes_with_complexity.csv'
+DATA_PATH = DEFAULT_DATA_PATH
+
+# Complexity bands: Simple (<= Q1 steps), Medium (<= Q3 steps), Complex (> Q3 steps), with
+# ingredient names normalized (plurals, synonyms, typos). For other settings pass e.g.
+# DatasetOptions(ComplexityBanding('ingredients_and_steps', ...), normalize_ingredients=False).
+DATASET_OPTIONS = DEFAULT_OPTIONS
+
+# Each visitor's favorites are saved under their own profile id, kept in the page URL
+# (?profile=...) so reloading or bookmarking the page brings the same list back
+PROFILE_PARAM = 'profile'
+
+# Ranked mode: default and maximum number of top recipes returned
+DEFAULT_TOP_K = 50
+MAX_TOP_K = 500
+
+# Complexity label markers (same colors the table styling used: green, orange, red)
+COMPLEXITY_MARKERS = {'Simple': '🟢', 'Medium': '🟠', 'Complex': '🔴'}
+
+# Ingredient type-ahead: number of suggestions sent to the sidebar multiselect
+INGREDIENT_SUGGESTIONS = 50
+
+# Detailed Recipe List pagination (recipes rendered per page)
+RESULTS_PAGE_SIZES = [10, 20, 50, 100]
+DEFAULT_RESULTS_PAGE_SIZE = 20
 
 # Dashboard Name and Tagline
 DASHBOARD_NAME = "👨‍🍳 Chef's Compass"
@@ -136,112 +164,69 @@ def render_html_component_box(html_content, key):
         st.session_state[key] = st.empty()
     st.session_state[key].markdown(html_content, unsafe_allow_html=True)
 
-@st.cache_data
-def convert_df_to_csv(df):
-    """Converts the DataFrame to a CSV string for download."""
-    return df.to_csv(index=False).encode('utf-8')
+def complexity_marker(label):
+    """Colored marker shown next to a complexity label (custom bandings get a neutral one)."""
+    return COMPLEXITY_MARKERS.get(label, '⚪')
 
-@st.cache_data
-def load_data(path):
-    """Loads and preprocesses the recipe data."""
-    try:
-        df = pd.read_csv(path)
-    except FileNotFoundError:
-        st.error(f"Error: Data file not found at {path}")
-        return pd.DataFrame(), [], []
+@st.cache_resource
+def get_engine():
+    """The recipe engine shared by all sessions (store, query result cache, favorites file)."""
+    return RecipeEngine(DATA_PATH, DATASET_OPTIONS)
 
-    q1 = df['num_steps'].quantile(0.25)
-    q3 = df['num_steps'].quantile(0.75)
-
-    def get_complexity(steps):
-        if steps <= q1:
-            return 'Simple'
-        elif steps <= q3:
-            return 'Medium'
-        else:
-            return 'Complex'
+def session_profile():
+    """The favorites profile id from the page URL; new visitors get a fresh one."""
+    profile = st.query_params.get(PROFILE_PARAM)
+    return profile or uuid.uuid4().hex
 
-    df['Complexity'] = df['num_steps'].apply(get_complexity)
+def load_data():
+    """Returns the latest shared, read-only RecipeStore (loaded once per server process).
 
-    if 'cleaned_ingredients_filtered' in df.columns:
-        all_ingredients_list = df['cleaned_ingredients_filtered'].astype(str).str.lower().str.split(', ').explode().dropna().unique()
-        all_ingredients_set = set(all_ingredients_list)
-        all_ingredients_set.discard('')
+    A background watcher swaps in a new store when the CSV or its artifact changes.
+    """
+    try:
+        return get_engine().store()
+    except FileNotFoundError:
+        st.error(f"Error: Data file not found at {DATA_PATH}")
+        return None
+
+def add_to_favorites(row_id):
+    """Adds a recipe (by row id in the session's store) to the favorites."""
+    session = st.session_state.recipes
+    recipe_title = session.store.titles[row_id]
+    if session.add_favorite(row_id):
+        st.success(f"Added **{recipe_title}** to favorites!")
     else:
-        all_ingredients_set = set()
+        st.warning(f"**{recipe_title}** is already in favorites.")
 
-    all_categories = sorted(list(df['category'].unique()))
+def add_many_to_favorites(start, stop):
+    """Adds every recipe on the current results page in one batch (one saved-list transaction)."""
+    session = st.session_state.recipes
+    new_ids = session.add_favorites(session.result_ids[start:stop].tolist())
+    if new_ids:
+        st.success(f"Added **{len(new_ids)}** recipes to favorites!")
+    else:
+        st.warning("All recipes on this page are already in favorites.")
 
-    return df, sorted(list(all_ingredients_set)), all_categories
+def remove_from_favorites(row_id):
+    """Removes a recipe (by row id in the session's store) from the favorites."""
+    session = st.session_state.recipes
+    recipe_title = session.store.titles[row_id]
+    session.remove_favorite(row_id)
+    st.success(f"Removed **{recipe_title}** from favorites.")
 
-@st.cache_data
-def filter_recipes(df, selected_ingredients, keywords, threshold_percent, selected_category):
-    """Filters the recipes based on selected category, ingredients, keywords, and match threshold."""
+def render_recipe_details(store, row_id):
+    """Renders the pre-parsed ingredient list and directions of one recipe."""
+    st.markdown("**Ingredients List:**")
+    st.markdown("- " + "\n- ".join(store.text.ingredients(row_id)))
     
-    if not selected_ingredients and selected_category == 'All Categories' and threshold_percent > 0:
-        return df.head(0) 
-
-    filtered_df = df.copy()
-    threshold = threshold_percent / 100.0
-    is_strict_match = (threshold_percent == 100) and (selected_ingredients)
-
-    if selected_category != 'All Categories':
-        filtered_df = filtered_df[filtered_df['category'] == selected_category].copy()
-        
-    if filtered_df.empty:
-        return filtered_df.head(0)
-
-    if selected_ingredients:
-        recipe_ingredients = filtered_df['cleaned_ingredients_filtered'].fillna('').astype(str).str.lower().str.split(', ')
-        filtered_df['recipe_ing_count'] = recipe_ingredients.apply(lambda x: len([i for i in x if i and i != '']))
-
-        def calculate_match_score(recipe_ing_list):
-            if not selected_ingredients: 
-                return 1.0 
-            
-            cleaned_recipe_ing_list = set([i for i in recipe_ing_list if i and i != ''])
-            
-            if not cleaned_recipe_ing_list:
-                return 0 
-            
-            matched_count = len(set(selected_ingredients) & cleaned_recipe_ing_list)
-            return matched_count / len(selected_ingredients)
-
-        filtered_df['match_score'] = recipe_ingredients.apply(calculate_match_score)
-        
-        filtered_df = filtered_df[filtered_df['match_score'] >= threshold].copy()
-        
-        if is_strict_match:
-            num_selected = len(selected_ingredients)
-            filtered_df = filtered_df[filtered_df['recipe_ing_count'] == num_selected].copy()
-
-    return filtered_df.drop(columns=['match_score', 'recipe_ing_count'], errors='ignore')
-
-def add_to_favorites(df, recipe_title):
-    """Adds a recipe to the session state favorites list."""
-    if 'favorites' not in st.session_state:
-        st.session_state.favorites = []
-
-    if recipe_title not in [r['recipe_title'] for r in st.session_state.favorites]:
-        recipe_data = df[df['recipe_title'] == recipe_title].iloc[0]
-        favorite_entry = {
-            'recipe_title': recipe_data['recipe_title'],
-            'Ingredients list': recipe_data['cleaned_ingredients_filtered'],
-            'Directions': recipe_data['directions'],
-            'Complexity': recipe_data['Complexity']
-        }
-        st.session_state.favorites.append(favorite_entry)
-        st.success(f"Added **{recipe_title}** to favorites!")
+    st.markdown("**Directions:**")
+    steps = store.text.steps(row_id)
+    if store.text.directions_parsed[row_id]:
+        for i, step in enumerate(steps, 1):
+            st.markdown(f"**Step {i}**: {step}")
     else:
-        st.warning(f"**{recipe_title}** is already in favorites.")
-
-def remove_from_favorites(recipe_title):
-    """Removes a recipe from the session state favorites list."""
-    st.session_state.favorites = [
-        r for r in st.session_state.favorites
-        if r['recipe_title'] != recipe_title
-    ]
-    st.success(f"Removed **{recipe_title}** from favorites.")
+        # Directions that did not parse as a list are shown as raw text
+        st.write(steps[0])
 
 def render_recipe_count_box(num_recipes):
     """Renders the custom HTML box for the recipe count."""
@@ -260,16 +245,12 @@ def apply_filter_action(should_scroll=True):
     """
     selected_cat = st.session_state.selected_category_selectbox
     selected_ing = st.session_state.selected_ingredients_dropdown
-    keywords = "" 
     threshold = st.session_state.threshold_slider
-    
-    st.session_state.filtered_results = filter_recipes(
-        st.session_state.data, 
-        selected_ing, 
-        keywords, 
-        threshold,
-        selected_cat
-    )
+    top_k = st.session_state.rank_top_k if st.session_state.rank_results else None
+    keywords = st.session_state.keyword_search
+
+    # Also moves the session to the newest dataset version
+    st.session_state.recipes.apply_filters(selected_ing, threshold, selected_cat, top_k, keywords)
 
     if should_scroll:
         st.success("Filters applied! Results updated.")
@@ -284,17 +265,77 @@ def apply_filter_action(should_scroll=True):
         """
         st.markdown(scroll_script, unsafe_allow_html=True)
 
+def render_results_export(store, result_ids, result_query):
+    """Download button for the filtered recipes; the file is only generated when clicked."""
+    col_format, col_button = st.columns([1, 3])
+    export_format = col_format.selectbox(
+        'Export format', list(EXPORT_FORMATS), key='results_export_format', label_visibility='collapsed'
+    )
+    col_button.download_button(
+        label=f"Download these {len(result_ids):,} recipes ({export_format})",
+        data=lambda: store.export(export_format, result_ids, result_query),
+        file_name=f"chefs_compass_recipes.{EXPORT_FORMATS[export_format].extension}",
+        mime=EXPORT_FORMATS[export_format].mime,
+        key='results_export_button'
+    )
+
+def current_results_page(num_items, page_size):
+    """
+    Returns (page, page_count, start, stop) for the Detailed Recipe List.
+    The stored page survives filter changes and is only clamped to the new page count.
+    """
+    page_count = max(1, -(-num_items // page_size))
+    page = min(max(1, st.session_state.get('results_page', 1)), page_count)
+    st.session_state.results_page = page
+    start = (page - 1) * page_size
+    return page, page_count, start, min(start + page_size, num_items)
+
+def set_results_page(page):
+    """Callback for the page navigation buttons."""
+    st.session_state.results_page = page
+
+def keep_first_visible_recipe():
+    """When the page size changes, stay on the page holding the first recipe that was visible."""
+    old_size = st.session_state.get('results_last_page_size', DEFAULT_RESULTS_PAGE_SIZE)
+    first_visible = (st.session_state.get('results_page', 1) - 1) * old_size
+    st.session_state.results_page = first_visible // st.session_state.results_page_size + 1
+    st.session_state.results_last_page_size = st.session_state.results_page_size
+
+def render_page_navigation(page, page_count, start, stop, num_items):
+    """Renders Previous/Next controls and the visible range for the Detailed Recipe List."""
+    col_prev, col_info, col_next = st.columns([1, 3, 1])
+    col_prev.button(
+        '◀ Previous',
+        key='results_prev_page',
+        on_click=set_results_page,
+        args=(page - 1,),
+        disabled=page <= 1
+    )
+    col_info.markdown(
+        f"<p style='text-align: center;'>Page <b>{page}</b> of <b>{page_count:,}</b> "
+        f"&middot; recipes {start + 1:,}&ndash;{stop:,} of {num_items:,}</p>",
+        unsafe_allow_html=True
+    )
+    col_next.button(
+        'Next ▶',
+        key='results_next_page',
+        on_click=set_results_page,
+        args=(page + 1,),
+        disabled=page >= page_count
+    )
+
 # --- Page Functions (Recipe Explorer and Favorites are kept here as requested) ---
 
-def page_recipe_explorer(df):
+def page_recipe_explorer(session):
     """Handles the filtering and results display for recipes."""
+    store = session.store
     
     st.title("Recipe Explorer 🔍")
     
     # --- Sidebar Filtering Logic ---
     st.sidebar.markdown("## Ingredient Filters")
 
-    category_options = ['All Categories'] + st.session_state.all_categories
+    category_options = ['All Categories'] + list(store.all_categories)
     default_cat = st.session_state.get('selected_category_selectbox', 'All Categories')
     default_cat_index = category_options.index(default_cat) if default_cat in category_options else 0
     
@@ -305,13 +346,21 @@ def page_recipe_explorer(df):
         key='selected_category_selectbox'
     )
 
+    # Only the current selection plus the best completions of the search text are sent
+    search_text = st.sidebar.text_input(
+        '**Search Ingredients**:',
+        placeholder='e.g. tom, green on',
+        key='ingredient_search'
+    )
+    selected = st.session_state.selected_ingredients_dropdown
+    suggestions = [ing for ing in store.search.complete(search_text, INGREDIENT_SUGGESTIONS) if ing not in selected]
     st.sidebar.multiselect(
-        '**Select Ingredients** (from all available ingredients):',
-        st.session_state.all_ingredients,
+        f'**Select Ingredients** (most used matches of your search, {len(store.all_ingredients):,} in total):',
+        selected + suggestions,
         key='selected_ingredients_dropdown'
     )
 
-    threshold_percent = st.sidebar.slider(
+    st.sidebar.slider(
         '**Ingredient Match Threshold** (%)',
         min_value=0, max_value=100, 
         value=st.session_state.get('threshold_slider', 50), 
@@ -319,8 +368,25 @@ def page_recipe_explorer(df):
         key='threshold_slider'
     )
 
-    selected_ingredients = st.session_state.selected_ingredients_dropdown
-    
+    # Looked up in the prebuilt title/directions index; every word must appear
+    st.sidebar.text_input(
+        '**Search Titles & Directions**:',
+        placeholder='e.g. grilled lemon chicken',
+        key='keyword_search'
+    )
+
+    rank_results = st.sidebar.checkbox(
+        '**Rank by Best Match** (top recipes only)',
+        key='rank_results'
+    )
+    if rank_results:
+        st.sidebar.number_input(
+            'Number of top recipes',
+            min_value=1, max_value=MAX_TOP_K,
+            step=10,
+            key='rank_top_k'
+        )
+
     st.sidebar.button(
         '**Apply Filters**',
         on_click=apply_filter_action, 
@@ -329,30 +395,35 @@ def page_recipe_explorer(df):
     
     # --- Main Page Display ---
     
-    if st.session_state.filtered_results is None:
+    if session.result_ids is None:
         apply_filter_action(should_scroll=False) 
         
-    filtered_df = st.session_state.filtered_results
-    
-    # --- SORTING LOGIC ---
-    complexity_order = ['Simple', 'Medium', 'Complex']
+    # Only the row ids live in session state, and only the titles column is sliced for
+    # the table (never whole rows). Rows are stored in complexity order, so no per-rerun sort.
+    with metrics.timer('result_rows_seconds'):
+        result_titles = store.titles[session.result_ids]
     
-    if not filtered_df.empty:
-        filtered_df['Complexity'] = pd.Categorical(
-            filtered_df['Complexity'], 
-            categories=complexity_order, 
-            ordered=True
-        )
-        filtered_df = filtered_df.sort_values(by='Complexity').reset_index(drop=True)
-    
-    num_recipes = len(filtered_df)
+    num_recipes = len(session.result_ids)
 
     # RENDER RECIPE COUNT BOX 
     render_recipe_count_box(num_recipes)
     
+    if session.result_ranked and num_recipes:
+        if session.result_query[-1]:
+            st.caption(f"Showing the top {num_recipes:,} recipes ranked by keyword relevance (BM25).")
+        else:
+            st.caption(
+                f"Showing the top {num_recipes:,} recipes ranked by match score "
+                "(share of your ingredients used, share of the recipe you already have, simplicity)."
+            )
+    
     if num_recipes == 0:
-        if selected_ingredients:
-            st.warning(f"No recipes use {threshold_percent}% or more of your selected ingredients.")
+        # Describe the applied query, not the sidebar widgets (they may have changed since Apply)
+        _, applied_ingredients, _, applied_threshold, _, applied_terms = session.result_query
+        if applied_terms:
+            st.warning(f"No recipes matching your filters mention all of: {' '.join(applied_terms)}")
+        elif applied_ingredients:
+            st.warning(f"No recipes use {applied_threshold}% or more of your selected ingredients.")
         else:
             st.warning("No recipes match your current filter criteria.")
         return
@@ -362,39 +433,41 @@ def page_recipe_explorer(df):
     # Complexity Table 
     st.subheader("Recipe Complexity Breakdown")
 
-
-    def color_complexity(val):
-        """Applies CSS styling based on the Complexity value."""
-        if val == 'Complex':
-            return 'color: #D9534F; font-weight:bold;'
-        elif val == 'Medium':
-            return 'color: #F0AD4E; font-weight:bold;'
-        elif val == 'Simple':
-            return 'color: #5CB85C; font-weight:bold;'
-        return 'color: #333333;'
-
-    # Prepare the DataFrame for display
-    complexity_table_df = filtered_df[['recipe_title', 'Complexity']].copy()
-    complexity_table_df.rename(columns={'recipe_title': 'Recipe Title'}, inplace=True)
-    
-    # Apply color coding using Styler
-    styled_df = complexity_table_df.style.applymap(
-        color_complexity, 
-        subset=['Complexity'] 
-    )
-    
-    # Inject an anchor ID for CSS targeting of the white box
-    st.markdown('<div id="complexity-table-container">', unsafe_allow_html=True)
-    
-    with st.container():
-        # Display the styled dataframe. 
-        st.dataframe(
-            styled_df,
-            use_container_width=True,
-            height=450 
-        )
+    with metrics.timer('render_complexity_table_seconds'):
+        # Band counts come straight from the int8 complexity codes of the result rows
+        result_codes = store.complexity_codes[session.result_ids]
+        band_counts = np.bincount(result_codes, minlength=len(store.complexity_labels))
+        for col, label, count in zip(st.columns(len(store.complexity_labels)), store.complexity_labels, band_counts):
+            col.metric(f"{complexity_marker(label)} {label}", f"{count:,}", f"{count / num_recipes:.0%}", delta_color="off")
+
+        # Colored by a marker in the category labels instead of styling every cell
+        complexity_table_df = pd.DataFrame({
+            'Recipe Title': result_titles,
+            'Complexity': pd.Categorical.from_codes(
+                result_codes,
+                categories=[f"{complexity_marker(label)} {label}" for label in store.complexity_labels],
+                ordered=True
+            ),
+        })
+    
+        # Inject an anchor ID for CSS targeting of the white box
+        st.markdown('<div id="complexity-table-container">', unsafe_allow_html=True)
+    
+        with st.container():
+            st.dataframe(
+                complexity_table_df,
+                use_container_width=True,
+                height=450,
+                hide_index=True,
+                column_config={
+                    'Recipe Title': st.column_config.TextColumn('Recipe Title', width='large'),
+                    'Complexity': st.column_config.TextColumn('Complexity', width='small'),
+                }
+            )
     
-    st.markdown('</div>', unsafe_allow_html=True) 
+        st.markdown('</div>', unsafe_allow_html=True) 
+
+    render_results_export(store, session.result_ids, session.result_query)
 
     st.markdown("---")
 
@@ -405,80 +478,71 @@ def page_recipe_explorer(df):
     
     st.markdown('<div id="detailed_recipe_container_wrapper" style="margin-top: 15px;">', unsafe_allow_html=True)
     
-    with st.container():
-        for index, row in filtered_df.iterrows():
-            title = row['recipe_title']
+    page_size = st.selectbox(
+        'Recipes per page',
+        RESULTS_PAGE_SIZES,
+        index=RESULTS_PAGE_SIZES.index(DEFAULT_RESULTS_PAGE_SIZE),
+        key='results_page_size',
+        on_change=keep_first_visible_recipe
+    )
+    page, page_count, start, stop = current_results_page(num_recipes, page_size)
+
+    st.button(
+        f'⭐ Add all {stop - start} on this page to Favorites',
+        key='fav_page_btn',
+        on_click=add_many_to_favorites,
+        args=(start, stop)
+    )
+    
+    with metrics.timer('render_detailed_list_seconds'):
+        with st.container():
+            # Only the current page is rendered, so widget count is bounded by the page size.
+            # Buttons carry just the row id; callbacks resolve it against the shared store.
+            for row_id in session.result_ids[start:stop].tolist():
+                title = store.titles[row_id]
             
-            with st.expander(f"**{title}** - *{row['Complexity']}*"):
-                
-                st.markdown("**Ingredients List:**")
-                ingredients_list = [ing.strip().capitalize() for ing in str(row['cleaned_ingredients_filtered']).split(',') if ing.strip()]
-                st.markdown("- " + "\n- ".join(ingredients_list))
-                
-                st.markdown("**Directions:**")
-                try:
-                    directions_list = ast.literal_eval(row['directions'])
-                    if isinstance(directions_list, list):
-                        for i, step in enumerate(directions_list, 1):
-                            st.markdown(f"**Step {i}**: {step.strip()}")
-                    else:
-                        st.write(row['directions'])
-                except:
-                    st.write(row['directions'])
+                with st.expander(f"**{title}** - *{store.complexity_label(row_id)}*"):
+                    render_recipe_details(store, row_id)
 
-                st.button(
-                    '⭐ Add to Favorites',
-                    key=f'fav_btn_{index}', 
-                    on_click=add_to_favorites,
-                    args=(df, title) 
-                )
+                    st.button(
+                        '⭐ Add to Favorites',
+                        key=f'fav_btn_{row_id}', 
+                        on_click=add_to_favorites,
+                        args=(row_id,) 
+                    )
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+    render_page_navigation(page, page_count, start, stop, num_recipes)
 
-def page_favorites():
+
+def page_favorites(session):
     """Displays the list of favorite recipes."""
+    store = session.store
     st.header("My Favorite Recipes ❤️")
     st.markdown("---")
 
-    if 'favorites' not in st.session_state or not st.session_state.favorites:
+    if not session.favorites:
         st.info("You haven't added any recipes to your favorites yet. Explore recipes to find some!")
         return
 
-    fav_df = pd.DataFrame(st.session_state.favorites)
-    
-    st.subheader(f"Total Favorites: {len(fav_df)}")
+    st.subheader(f"Total Favorites: {len(session.favorites)}")
     
     st.markdown('<div id="favorites_list_container_wrapper" style="margin-top: 15px;"></div>', unsafe_allow_html=True)
 
     with st.container():
-        for index, row in fav_df.iterrows():
-            title = row['recipe_title']
+        # Titles and complexity are read from the shared store by row id
+        for row_id in list(session.favorites):
+            title = store.titles[row_id]
             
-            with st.expander(f"**{title}** - *{row['Complexity']}*"):
-                
-                st.markdown("**Ingredients List:**")
-                ingredients_content = row['Ingredients list']
-                ingredients_list = [ing.strip().capitalize() for ing in str(ingredients_content).split(',') if ing.strip()]
-                st.markdown("- " + "\n- ".join(ingredients_list))
-                
-                st.markdown("**Directions:**")
-                directions_content = row['Directions']
-                try:
-                    directions_list = ast.literal_eval(directions_content)
-                    if isinstance(directions_list, list):
-                        for i, step in enumerate(directions_list, 1):
-                            st.markdown(f"**Step {i}**: {step.strip()}")
-                    else:
-                        st.write(directions_content)
-                except:
-                    st.write(directions_content)
+            with st.expander(f"**{title}** - *{store.complexity_label(row_id)}*"):
+                render_recipe_details(store, row_id)
 
                 st.button(
                     '🗑️ Remove from Favorites',
-                    key=f'unfav_btn_{index}',
+                    key=f'unfav_btn_{row_id}',
                     on_click=remove_from_favorites,
-                    args=(title,)
+                    args=(row_id,)
                 )
     st.markdown("---")
 
@@ -490,28 +554,33 @@ if __name__ == '__main__':
     # 1. Apply Custom CSS first
     st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
     
-    # 2. Load data on app startup
+    # 2. Load the shared recipe store (once per server process, not per session)
     try:
-        data, all_ingredients, all_categories = load_data(DATA_PATH)
-        st.session_state.data = data
-        st.session_state.all_ingredients = all_ingredients
-        st.session_state.all_categories = all_categories
+        latest_store = load_data()
+        if latest_store is None:
+            raise FileNotFoundError(DATA_PATH)
+
+        # Each session keeps the store version its results were computed against, and
+        # its favorites as an ordered set of row ids, loaded once from its profile's saved list
+        if 'recipes' not in st.session_state:
+            st.session_state.recipes = get_engine().session(session_profile())
     except Exception:
         # Note: If this error occurs, ensure the 'data' folder and CSV are in your GitHub repo.
         st.error(f"Error initializing data. Please check the data file: `{DATA_PATH}`. Ensure it is in a 'data' subfolder.")
         st.stop()
+    session = st.session_state.recipes
+    store = session.store
+    if st.query_params.get(PROFILE_PARAM) != session.profile:
+        st.query_params[PROFILE_PARAM] = session.profile
     
     # 3. Initialize session state
     STARTER_INGREDIENTS = ["yam", "salmon"]
     valid_starter_ingredients = [
         ing for ing in STARTER_INGREDIENTS 
-        if ing in st.session_state.all_ingredients
+        if ing in store.index.ingredient_ids
     ]
 
     # Initialize all necessary session state variables
-    if 'favorites' not in st.session_state:
-        st.session_state.favorites = []
-    
     if 'selected_category_selectbox' not in st.session_state:
         st.session_state.selected_category_selectbox = 'All Categories'
     
@@ -521,16 +590,27 @@ if __name__ == '__main__':
     if 'threshold_slider' not in st.session_state:
         st.session_state.threshold_slider = 50
 
+    if 'keyword_search' not in st.session_state:
+        st.session_state.keyword_search = ''
+
+    if 'rank_results' not in st.session_state:
+        st.session_state.rank_results = False
+
+    if 'rank_top_k' not in st.session_state:
+        st.session_state.rank_top_k = DEFAULT_TOP_K
+
     if 'app_page_select' not in st.session_state:
         st.session_state['app_page_select'] = 'Recipe Explorer'
     
     # 4. Calculate initial results on first load
-    if 'filtered_results' not in st.session_state:
+    if session.result_ids is None:
         apply_filter_action(should_scroll=False)
 
     # --- Sidebar Navigation for Pages within app.py ---
     st.sidebar.title(DASHBOARD_NAME)
     st.sidebar.markdown(f"**_{TAGLINE}_**")
+    if session.newer_store_available():
+        st.sidebar.info("An updated recipe dataset is available. Apply the filters to switch to it.")
     
     # Allows switching between Recipe Explorer and Favorites in the sidebar
     # The other pages (01_ and 02_) are handled automatically by Streamlit
@@ -542,7 +622,12 @@ if __name__ == '__main__':
     
     # --- Page Router for Pages within app.py ---
     if page_selection == 'Favorites':
-        page_favorites()
+        with metrics.timer('page_favorites_seconds'):
+            page_favorites(session)
     else:
         # Default to Recipe Explorer
-        page_recipe_explorer(data)
\ No newline at end of file
+        with metrics.timer('page_recipe_explorer_seconds'):
+            page_recipe_explorer(session)
+
+    # Per-session memory after each rerun (see the Diagnostics page)
+    metrics.observe('session_state_bytes', session_nbytes(st.session_state), buckets=SIZE_BUCKETS)
\ No newline at end of file
@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_catalog import catalog_path  # noqa: E402
+
+# -------------------------------------------------
+# API Load Test
+# -------------------------------------------------
+# Drives serve_api.py with concurrent keep-alive clients and reports requests
+# per second and latency percentiles. Without --url it starts a local instance
+# on a free port over a synthetic catalog (or --csv) and stops it afterwards.
+# Queries are random picks among the most used ingredients, so part of them
+# hit the shared query cache the way real traffic does.
+#
+#   python benchmarks/load_test_api.py --recipes 64000 --concurrency 32 --duration 20
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_DURATION = 10.0
+DEFAULT_RECIPES = 64_000
+STARTUP_TIMEOUT = 600.0
+# Ingredients queries are drawn from
+POPULAR_INGREDIENTS = 60
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n'.encode('latin-1'))
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        return status, await self.reader.readexactly(length)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def random_query(rng, ingredients, categories):
+    params = {
+        'ingredients': ','.join(rng.sample(ingredients, rng.randint(1, 5))),
+        'threshold': rng.choice([25, 50, 75, 100]),
+        'page': rng.randint(1, 3),
+        'fields': 'id,recipe_title,complexity',
+    }
+    if rng.random() < 0.3:
+        params['category'] = rng.choice(categories)
+    if rng.random() < 0.2:
+        params['top_k'] = 50
+    return '/recipes?' + urlencode(params)
+
+
+async def client(host, port, deadline, rng, ingredients, categories, latencies, errors):
+    connection = Connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status, _ = await connection.request(random_query(rng, ingredients, categories))
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    finally:
+        connection.close()
+
+
+async def run_load(host, port, concurrency, duration, seed):
+    setup = Connection(host, port)
+    _, body = await setup.request(f'/ingredients?limit={POPULAR_INGREDIENTS}')
+    ingredients = json.loads(body)['ingredients']
+    _, body = await setup.request('/categories')
+    categories = json.loads(body)['categories'][1:]
+    setup.close()
+
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, started + duration, random.Random(seed + i), ingredients, categories, latencies, errors)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    samples = np.array(latencies) * 1e3
+    return {
+        'concurrency': concurrency,
+        'duration_s': elapsed,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': len(latencies) / elapsed,
+        'latency_ms': {
+            'p50': float(np.percentile(samples, 50)),
+            'p95': float(np.percentile(samples, 95)),
+            'p99': float(np.percentile(samples, 99)),
+            'max': float(samples.max()),
+        } if len(samples) else None,
+    }
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_server(csv_path, port, workers):
+    """Starts serve_api.py and waits until /health answers."""
+    command = [sys.executable, os.path.join(ROOT, 'serve_api.py'), csv_path, '--port', str(port)]
+    if workers:
+        command += ['--workers', str(workers)]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'serve_api.py exited with code {server.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError('serve_api.py did not start in time')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the recipe HTTP API.')
+    parser.add_argument('--url', default=None, help='running instance, e.g. http://127.0.0.1:8765')
+    parser.add_argument('--csv', default=None, help='dataset for the local instance (default: synthetic catalog)')
+    parser.add_argument('--recipes', type=int, default=DEFAULT_RECIPES, help='synthetic catalog size')
+    parser.add_argument('--workers', type=int, default=None, help='request threads of the local instance')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='simultaneous clients')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        csv_path = args.csv or catalog_path(os.path.join(ROOT, 'benchmarks', '.data'), args.recipes, args.seed)
+        host, port = '127.0.0.1', free_port()
+        print(f'starting serve_api.py on {csv_path} ...', file=sys.stderr)
+        server = start_server(csv_path, port, args.workers)
+    try:
+        report = asyncio.run(run_load(host, port, args.concurrency, args.duration, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2))
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
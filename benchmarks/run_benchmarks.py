@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Run as a script from anywhere: the recipe_engine package lives one directory up
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_catalog import catalog_path  # noqa: E402
+from recipe_engine.dataset_cache import DEFAULT_OPTIONS, load_dataset  # noqa: E402
+from recipe_engine.incremental_query import IncrementalQuery  # noqa: E402
+from recipe_engine.ingredient_search import IngredientSearch  # noqa: E402
+from recipe_engine.recipe_index import ALL_CATEGORIES, IngredientIndex  # noqa: E402
+from recipe_engine.recipe_ranking import rank_top_k  # noqa: E402
+from recipe_engine.pantry_batch import score_pantries  # noqa: E402
+from recipe_engine.recipe_store import RecipeStore  # noqa: E402
+from score_pantries import random_pantries  # noqa: E402
+
+# -------------------------------------------------
+# Headless Benchmarks
+# -------------------------------------------------
+# Times the load, filter and result preparation paths on synthetic catalogs,
+# without Streamlit. Each catalog size runs in a fresh subprocess, so its peak
+# memory is not inflated by the sizes before it. Allocations are traced in a
+# second subprocess per size that only builds and loads the catalog, since
+# tracemalloc slows Python code several times over and would skew the timings.
+# The report is JSON (p50/p95 per scenario plus peak memory), and --baseline
+# compares it with an earlier report.
+#
+#   python benchmarks/run_benchmarks.py --sizes 64000 500000 --output bench.json
+
+DEFAULT_SIZES = [64_000, 500_000, 5_000_000]
+DEFAULT_REPEAT = 30
+DEFAULT_DATA_DIR = os.path.join(ROOT, 'benchmarks', '.data')
+# A scenario is reported as a regression when its p50 grows by more than this factor
+REGRESSION_FACTOR = 1.25
+PAGE_SIZE = 20
+# Pantries scored per batch run
+BATCH_PANTRIES = 1000
+
+
+def timings(func, repeat):
+    """Runs ``func`` repeatedly; returns (p50 ms, p95 ms, mean ms, last result)."""
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1e3)
+    samples = np.array(samples)
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'mean_ms': float(samples.mean()),
+        'runs': repeat,
+    }, result
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def query_scenarios(index):
+    """Representative queries, picked by ingredient frequency rank so every catalog size is comparable."""
+    frequencies = np.diff(np.asarray(index.offsets))
+    by_frequency = [index.vocabulary[i] for i in np.argsort(-frequencies, kind='stable')]
+    tail = by_frequency[len(by_frequency) // 2:]
+    category = index.categories[len(index.categories) // 2]
+    return {
+        'rare_ingredients': (tail[:2], 50, ALL_CATEGORIES),
+        'common_ingredients': (by_frequency[:2], 50, ALL_CATEGORIES),
+        'many_ingredients': (by_frequency[:4] + by_frequency[20:24], 50, ALL_CATEGORIES),
+        'strict_100_percent': (by_frequency[:3], 100, ALL_CATEGORIES),
+        'category_only': ([], 0, category),
+        'common_in_category': (by_frequency[:3], 50, category),
+    }
+
+
+def benchmark_catalog(num_recipes, repeat, data_dir, seed):
+    """All measurements for one catalog size (run inside a fresh process)."""
+    report = {'recipes': num_recipes}
+
+    started = time.perf_counter()
+    csv_path = catalog_path(data_dir, num_recipes, seed)
+    report['generate_or_reuse_csv_s'] = time.perf_counter() - started
+    report['csv_mb'] = os.path.getsize(csv_path) / 1e6
+
+    cache_dir = tempfile.mkdtemp(prefix='bench-cache-')
+    try:
+        started = time.perf_counter()
+        dataset = load_dataset(csv_path, cache_dir, DEFAULT_OPTIONS)
+        report['cold_load_s'] = time.perf_counter() - started
+        del dataset
+
+        report['warm_load'], dataset = timings(lambda: load_dataset(csv_path, cache_dir, DEFAULT_OPTIONS), 3)
+        store = RecipeStore(dataset, os.path.join(cache_dir, 'exports'))
+        report['vocabulary'] = {'ingredients': len(store.index.vocabulary), 'raw_names': len(store.index.raw_vocabulary)}
+
+        build_repeat = max(1, min(5, 5_000_000 // max(num_recipes, 1)))
+        report['index_build'], _ = timings(lambda: IngredientIndex.build(store.df, store.index.normalizer), build_repeat)
+        report['search_build'], _ = timings(lambda: IngredientSearch.from_index(store.index), build_repeat)
+        report['type_ahead'], _ = timings(lambda: store.search.complete('gar'), repeat)
+
+        index = store.index
+        levels = len(store.complexity_labels)
+        report['queries'] = {}
+        for name, (selected, threshold, category) in query_scenarios(index).items():
+            stats, rows = timings(lambda: index.query(selected, threshold, category), repeat)
+            stats['results'] = int(len(rows))
+            report['queries'][name] = stats
+
+            stats, _ = timings(lambda: rank_top_k(
+                index, store.complexity_codes, levels, selected, threshold, category, 50), repeat)
+            report['queries'][f'{name}_ranked_top50'] = stats
+
+        # One more ingredient on top of an existing selection, as a session refines it
+        selected, threshold, category = query_scenarios(index)['many_ingredients']
+        engine = IncrementalQuery(index)
+
+        def refine():
+            engine.query(selected[:-1], threshold, category)
+            started = time.perf_counter()
+            engine.query(selected, threshold, category)
+            return time.perf_counter() - started
+        samples = np.array([refine() for _ in range(repeat)]) * 1e3
+        report['queries']['incremental_add_one'] = {
+            'p50_ms': float(np.percentile(samples, 50)), 'p95_ms': float(np.percentile(samples, 95)),
+            'mean_ms': float(samples.mean()), 'runs': repeat,
+        }
+
+        # Meal-planning batch: many pantries against the whole catalog at 50%
+        pantries = random_pantries(index, BATCH_PANTRIES, seed)
+        stats, _ = timings(lambda: score_pantries(
+            index, store.complexity_codes, levels, pantries, 50, ALL_CATEGORIES, 10), max(1, repeat // 10))
+        stats['pantries_per_second'] = BATCH_PANTRIES / (stats['p50_ms'] / 1e3)
+        report['batch_pantries'] = stats
+
+        # What the Recipe Explorer does with a result: band counts, the table columns, one page of details
+        result = index.query(*query_scenarios(index)['common_ingredients'])
+
+        def prepare():
+            counts = np.bincount(store.complexity_codes[result], minlength=levels)
+            table = pd.DataFrame({
+                'Recipe Title': store.titles[result],
+                'Complexity': pd.Categorical.from_codes(store.complexity_codes[result], list(store.complexity_labels)),
+            })
+            page = [(store.text.ingredients(row), store.text.steps(row)) for row in result[:PAGE_SIZE].tolist()]
+            return counts, table, page
+        report['result_preparation'], _ = timings(prepare, repeat)
+        report['result_preparation']['results'] = int(len(result))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report['peak_rss_mb'] = peak_rss_mb()
+    return report
+
+
+def memory_catalog(num_recipes, data_dir, seed):
+    """Peak traced allocations of a cold build plus load of one catalog (run inside a fresh process)."""
+    csv_path = catalog_path(data_dir, num_recipes, seed)
+    cache_dir = tempfile.mkdtemp(prefix='bench-cache-')
+    tracemalloc.start()
+    try:
+        # Cold build (parse, index, write), then the warm read the app serves from
+        load_dataset(csv_path, cache_dir, DEFAULT_OPTIONS)
+        store = RecipeStore(load_dataset(csv_path, cache_dir, DEFAULT_OPTIONS), os.path.join(cache_dir, 'exports'))
+        _, traced_peak = tracemalloc.get_traced_memory()
+        del store
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return {'peak_traced_mb': traced_peak / 1e6, 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_child(size, args, *extra):
+    """Runs one catalog measurement in a fresh interpreter and returns its JSON report."""
+    child = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--single', str(size), '--repeat', str(args.repeat),
+         '--seed', str(args.seed), '--data-dir', args.data_dir, *extra],
+        check=True, stdout=subprocess.PIPE, text=True,
+    )
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def compare(report, baseline, factor=REGRESSION_FACTOR):
+    """[(catalog, scenario, baseline p50, current p50)] for scenarios slower by more than ``factor``."""
+    regressions = []
+    for size, catalog in report['catalogs'].items():
+        previous = baseline.get('catalogs', {}).get(size)
+        if not previous:
+            continue
+        for name, stats in catalog.get('queries', {}).items():
+            before = previous.get('queries', {}).get(name)
+            if before and stats['p50_ms'] > factor * before['p50_ms']:
+                regressions.append((size, name, before['p50_ms'], stats['p50_ms']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless load/filter/render benchmarks on synthetic catalogs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='runs per query scenario')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='where generated catalogs are kept')
+    parser.add_argument('--output', default=None, help='write the JSON report here (default: stdout)')
+    parser.add_argument('--baseline', default=None, help='earlier JSON report to compare p50 latencies with')
+    parser.add_argument('--single', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--memory-pass', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        # Child process: one catalog, report on stdout
+        if args.memory_pass:
+            print(json.dumps(memory_catalog(args.single, args.data_dir, args.seed)))
+        else:
+            print(json.dumps(benchmark_catalog(args.single, args.repeat, args.data_dir, args.seed)))
+        return 0
+
+    report = {'environment': environment(), 'repeat': args.repeat, 'seed': args.seed, 'catalogs': {}}
+    for size in args.sizes:
+        print(f'benchmarking {size:,} recipes ...', file=sys.stderr)
+        catalog = run_child(size, args)
+        catalog['memory'] = run_child(size, args, '--memory-pass')
+        report['catalogs'][str(size)] = catalog
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(report, json.load(handle))
+        for size, name, before, after in regressions:
+            print(f'REGRESSION {size} {name}: p50 {before:.2f} ms -> {after:.2f} ms', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Synthetic Recipe Catalogs
+# -------------------------------------------------
+# CSV files with the same columns as the Kaggle "64k dishes" dataset, at any
+# size, reproducible from a seed. Ingredient use follows a Zipf law: a handful
+# of staples (salt, sugar, ...) appear in a large share of recipes and a long
+# tail appears in only a few. That skew decides posting list lengths and so
+# most of the filter cost. A few plural/synonym variants exercise
+# normalization.
+
+STAPLES = [
+    'salt', 'sugar', 'butter', 'all-purpose flour', 'eggs', 'garlic', 'onion', 'olive oil', 'water', 'milk',
+    'black pepper', 'vanilla extract', 'baking powder', 'tomatoes', 'lemon juice', 'brown sugar', 'baking soda',
+    'cinnamon', 'parmesan cheese', 'chicken breast', 'green onions', 'scallions', 'honey', 'soy sauce',
+    'heavy cream', 'carrots', 'celery', 'cilantro', 'ground beef', 'potatoes', 'yam', 'salmon',
+]
+CATEGORIES = [
+    'Main dishes', 'Desserts', 'Soups', 'Salads', 'Breakfast', 'Indian', 'Fruit salads', 'Side dishes',
+    'Appetizers', 'Drinks',
+]
+# Share of recipes per category (a few big categories, several small ones)
+CATEGORY_WEIGHTS = np.array([24, 20, 10, 10, 8, 8, 5, 6, 6, 3], dtype=float)
+
+CONSONANTS = list('bcdfghjklmnprstvz')
+VOWELS = list('aeiou')
+
+ZIPF_EXPONENT = 1.07
+MEAN_INGREDIENTS = 9
+MEAN_STEPS = 7
+
+
+def vocabulary_size(num_recipes):
+    """Distinct ingredients grow sublinearly with the catalog (about 6k at 64k recipes)."""
+    return int(len(STAPLES) + 25 * num_recipes ** 0.5)
+
+
+def pseudo_words(count, rng):
+    """Distinct pronounceable names ("dakomi", "tel suvano"), unlike each other the way real ingredients are."""
+    words = set()
+    while len(words) < count:
+        syllables = rng.integers(2, 5)
+        word = ''.join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(syllables))
+        if rng.random() < 0.3:
+            word = ''.join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(2)) + ' ' + word
+        if word not in STAPLES:
+            words.add(word)
+    return sorted(words)
+
+
+def generate_catalog(num_recipes, seed=0):
+    """DataFrame with the dataset's columns and ``num_recipes`` synthetic recipes."""
+    rng = np.random.default_rng(seed)
+    tail = pseudo_words(vocabulary_size(num_recipes) - len(STAPLES), rng)
+    vocabulary = STAPLES + list(rng.permutation(tail))
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1) ** ZIPF_EXPONENT
+    weights /= weights.sum()
+
+    num_ingredients = np.clip(rng.poisson(MEAN_INGREDIENTS, num_recipes), 1, 40)
+    num_steps = np.clip(rng.poisson(MEAN_STEPS, num_recipes), 1, 60)
+    choices = rng.choice(len(vocabulary), size=int(num_ingredients.sum()), p=weights)
+    bounds = np.concatenate(([0], np.cumsum(num_ingredients)))
+    names = np.array(vocabulary, dtype=object)
+
+    ingredient_lists = [', '.join(names[choices[bounds[i]:bounds[i + 1]]]) for i in range(num_recipes)]
+    directions = [
+        str([f'Step {step + 1}: combine and cook.' for step in range(steps)]) for steps in num_steps.tolist()
+    ]
+    categories = rng.choice(len(CATEGORIES), size=num_recipes, p=CATEGORY_WEIGHTS / CATEGORY_WEIGHTS.sum())
+
+    return pd.DataFrame({
+        'recipe_title': [f'Recipe {i}' for i in range(num_recipes)],
+        'category': np.array(CATEGORIES, dtype=object)[categories],
+        'subcategory': 'General',
+        'description': '',
+        'ingredients': ingredient_lists,
+        'directions': directions,
+        'num_ingredients': num_ingredients,
+        'num_steps': num_steps,
+        'cleaned_ingredients_filtered': ingredient_lists,
+    })
+
+
+def catalog_path(data_dir, num_recipes, seed=0):
+    """Generates the catalog CSV once per (size, seed) and returns its path."""
+    path = os.path.join(data_dir, f'synthetic-{num_recipes}-seed{seed}.csv')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        staging = f'{path}.tmp'
+        generate_catalog(num_recipes, seed).to_csv(staging, index=False)
+        os.replace(staging, path)
+    return path
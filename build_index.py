@@ -0,0 +1,240 @@
+import argparse
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from recipe_engine.dataset_cache import (
+    add_build_arguments, artifact_dir, build_dataset, default_cache_dir, options_from_arguments,
+    remove_stale_artifacts, source_hash, write_artifact,
+)
+from recipe_engine.dataset_stats import compute_statistics
+from recipe_engine.ingredient_normalizer import IngredientNormalizer
+from recipe_engine.keyword_index import KeywordIndex
+from recipe_engine.recipe_complexity import complexity_codes, complexity_column
+from recipe_engine.recipe_index import (
+    INGREDIENT_COLUMN, IngredientIndex, canonical_postings, canonical_vocabulary, tokenize,
+)
+from recipe_engine.recipe_text import DIRECTIONS_COLUMN, RecipeText
+
+# -------------------------------------------------
+# Offline Sharded Artifact Build
+# -------------------------------------------------
+# Builds the same artifact as recipe_engine.dataset_cache.load_dataset, for catalogs too large
+# to preprocess comfortably inside `streamlit run app.py`:
+#   1. read only the measure columns to get the global complexity quantiles and
+#      every row's band
+#   2. stream the CSV in chunks: each chunk is split by band into shards and a
+#      process pool tokenizes ingredients, parses directions and builds the
+#      keyword index per shard while later chunks are read. Shards are then put
+#      in (band, chunk) order, which is exactly the stable complexity order
+#   3. merge the shard vocabularies and build the normalization mapping once
+#   4. the pool turns every shard into canonical posting lists, which are merged
+#      by concatenating each ingredient's shard slices (shards are consecutive
+#      row ranges, so the result is already sorted)
+#
+#   python build_index.py data/recipes.csv --workers 8
+#
+# --workers 0 builds in this process with dataset_cache.build_dataset instead,
+# exactly as the app would on first load.
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_SHARD_ROWS = 50_000
+TITLE_COLUMN = 'recipe_title'
+
+# Every complexity measure is computed from these columns alone
+MEASURE_COLUMNS = ('num_steps', 'num_ingredients')
+
+# Tokenize tasks queued per worker; bounds the chunks held while the pool catches up
+TASKS_PER_WORKER = 2
+
+
+def _tokenize_shard(shard):
+    """Worker: local raw vocabulary and (row, token) pairs plus parsed text and keyword index for one shard."""
+    rows, tokens = tokenize(shard)
+    raw_codes, raw_vocabulary = pd.factorize(tokens, sort=True)
+    text = RecipeText.build(shard)
+    return (
+        [str(name) for name in raw_vocabulary], raw_codes.astype(np.int32), rows.astype(np.int32),
+        text, KeywordIndex.build(shard[TITLE_COLUMN], text),
+    )
+
+
+def _shard_postings(rows, raw_codes, raw_to_canonical, num_rows, vocabulary_size):
+    """Worker: canonical posting lists of one shard (rows local to the shard)."""
+    return canonical_postings(rows, raw_codes, raw_to_canonical, num_rows, vocabulary_size)
+
+
+def merge_postings(shard_offsets, shard_postings, row_starts):
+    """Merges per-shard posting lists of consecutive row ranges into one (offsets, postings)."""
+    shard_counts = np.array([np.diff(offsets) for offsets in shard_offsets])
+    offsets = np.concatenate(([0], np.cumsum(shard_counts.sum(axis=0)))).astype(np.int64)
+    postings = np.empty(offsets[-1], dtype=np.int32)
+
+    # Each shard's slice of ingredient i starts after the earlier shards' slices of i
+    slice_starts = offsets[:-1] + np.cumsum(shard_counts, axis=0) - shard_counts
+    for counts, local_offsets, local_postings, row_start, starts in zip(
+            shard_counts, shard_offsets, shard_postings, row_starts, slice_starts):
+        destination = np.repeat(starts - local_offsets[:-1], counts) + np.arange(len(local_postings))
+        postings[destination] = local_postings + row_start
+    return offsets, postings
+
+
+class Progress:
+    """Prints one line per stage with elapsed time and rows per second."""
+
+    def __init__(self, stream=sys.stderr):
+        self.stream = stream
+        self.started = self.stage_started = time.perf_counter()
+
+    def update(self, message):
+        self.stream.write(f'\r  {message}\033[K')
+        self.stream.flush()
+
+    def stage(self, name, rows):
+        now = time.perf_counter()
+        elapsed = now - self.stage_started
+        rate = rows / elapsed if elapsed > 0 else float('inf')
+        self.stream.write(f'\r{name:<28} {elapsed:7.2f}s  {rate:12,.0f} rows/s\033[K\n')
+        self.stream.flush()
+        self.stage_started = now
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def build_sharded(csv_path, options, workers=None, chunk_rows=DEFAULT_CHUNK_ROWS, shard_rows=DEFAULT_SHARD_ROWS,
+                  progress=None):
+    """Same result as recipe_engine.dataset_cache.build_dataset, with the per-row work spread over a process pool."""
+    progress = progress or Progress()
+
+    # Pass 1: band of every row from the global quantiles
+    measures = pd.read_csv(csv_path, usecols=lambda column: column in MEASURE_COLUMNS)
+    codes = complexity_codes(measures, options.banding)
+    del measures
+    progress.stage('complexity bands', len(codes))
+
+    # Pass 2: tokenize shards of each chunk while the next chunks are read
+    columns = [col for col in (TITLE_COLUMN, INGREDIENT_COLUMN, DIRECTIONS_COLUMN)
+               if col in pd.read_csv(csv_path, nrows=0).columns]
+    keys, frames, tokenized, pending = [], [], [], deque()
+    max_pending = TASKS_PER_WORKER * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def submit(key, shard):
+            keys.append(key)
+            frames.append(shard)
+            pending.append(pool.submit(_tokenize_shard, shard[columns]))
+            while len(pending) > max_pending:
+                tokenized.append(pending.popleft().result())
+                progress.update(f'tokenized {len(tokenized):,} shards')
+
+        row_start = 0
+        for chunk_number, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_rows)):
+            chunk_codes = codes[row_start:row_start + len(chunk)]
+            row_start += len(chunk)
+            for band in np.unique(chunk_codes):
+                piece = chunk[chunk_codes == band]
+                for start in range(0, len(piece), shard_rows):
+                    submit((int(band), chunk_number, start), piece.iloc[start:start + shard_rows])
+        if not keys:
+            submit((0, 0, 0), pd.read_csv(csv_path, nrows=0))
+        while pending:
+            tokenized.append(pending.popleft().result())
+        progress.stage(f'tokenize + parse ({len(keys)} shards)', len(codes))
+
+        # Stable complexity order: bands ascending, and inside a band the original row order
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        frames = [frames[i] for i in order]
+        tokenized = [tokenized[i] for i in order]
+        shard_sizes = [len(frame) for frame in frames]
+        row_starts = np.concatenate(([0], np.cumsum(shard_sizes)[:-1])).astype(np.int64).tolist()
+
+        df = pd.concat(frames, ignore_index=True)
+        del frames
+        df['Complexity'] = complexity_column(np.sort(codes, kind='stable'), options.banding.labels)
+
+        # Global raw vocabulary, shard-local token ids remapped onto it
+        raw_vocabulary = sorted(set().union(*(vocabulary for vocabulary, _, _, _, _ in tokenized)))
+        raw_ids = {name: i for i, name in enumerate(raw_vocabulary)}
+        shard_codes, raw_counts = [], np.zeros(len(raw_vocabulary), dtype=np.int64)
+        for vocabulary, codes, _, _, _ in tokenized:
+            local_to_global = np.array([raw_ids[name] for name in vocabulary], dtype=np.int32)
+            shard_codes.append(local_to_global[codes])
+            raw_counts += np.bincount(shard_codes[-1], minlength=len(raw_vocabulary))
+
+        normalizer = IngredientNormalizer() if options.normalize_ingredients else None
+        vocabulary, raw_to_canonical = canonical_vocabulary(raw_vocabulary, raw_counts, normalizer)
+        progress.stage(f'normalize ({len(raw_vocabulary):,} names)', len(df))
+
+        shard_results = list(pool.map(
+            _shard_postings,
+            [rows for _, _, rows, _, _ in tokenized], shard_codes,
+            [raw_to_canonical] * len(row_starts), shard_sizes, [len(vocabulary)] * len(row_starts),
+        ))
+        progress.stage('shard posting lists', len(df))
+
+    # Shard parts are released as soon as they are merged
+    texts = [text for _, _, _, text, _ in tokenized]
+    keyword_parts = [keywords for _, _, _, _, keywords in tokenized]
+    del tokenized, shard_codes
+    offsets, postings = merge_postings(
+        [offsets for offsets, _, _ in shard_results], [postings for _, postings, _ in shard_results], row_starts
+    )
+    token_counts = np.concatenate([counts for _, _, counts in shard_results])
+    del shard_results
+    index = IngredientIndex.from_postings(
+        df, vocabulary, offsets, postings, token_counts, raw_vocabulary, raw_to_canonical, normalizer
+    )
+    text = RecipeText.concat(texts)
+    del texts
+    keywords = KeywordIndex.concat(keyword_parts)
+    del keyword_parts
+    progress.stage('merge shards', len(df))
+
+    all_ingredients = list(index.vocabulary)
+    all_categories = sorted(list(df['category'].unique()))
+    stats = compute_statistics(df, index, text, options.banding)
+    progress.stage('statistics', len(df))
+    return df, all_ingredients, all_categories, index, text, keywords, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the recipe artifact with a process pool (for large catalogs).')
+    add_build_arguments(parser)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count; 0 builds in this process)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='CSV rows read at a time')
+    parser.add_argument('--shard-rows', type=int, default=DEFAULT_SHARD_ROWS, help='rows per worker task')
+    parser.add_argument('--force', action='store_true', help='rebuild even if the artifact exists')
+    args = parser.parse_args(argv)
+
+    options = options_from_arguments(args)
+    cache_dir = args.cache_dir or default_cache_dir(args.csv_path)
+    digest = source_hash(args.csv_path, cache_dir)
+    path = artifact_dir(args.csv_path, cache_dir, digest, options)
+    if os.path.isdir(path) and not args.force:
+        print(f'{path} is up to date (use --force to rebuild)')
+        return
+
+    progress = Progress()
+    if args.workers == 0:
+        dataset = build_dataset(args.csv_path, options)
+        progress.stage('build in process', len(dataset[0]))
+    else:
+        dataset = build_sharded(args.csv_path, options, args.workers, args.chunk_rows, args.shard_rows, progress)
+    shutil.rmtree(path, ignore_errors=True)
+    write_artifact(path, digest, *dataset)
+    remove_stale_artifacts(args.csv_path, cache_dir, keep=path, options=options)
+    progress.stage('write artifact', len(dataset[0]))
+
+    elapsed = progress.total()
+    print(f'{len(dataset[0]):,} recipes, {len(dataset[1]):,} ingredients, {len(dataset[2])} categories '
+          f'in {elapsed:.1f}s ({len(dataset[0]) / elapsed:,.0f} recipes/s) -> {path}')
+
+
+if __name__ == '__main__':
+    main()
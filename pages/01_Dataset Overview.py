@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 
+from recipe_engine import EXPORT_FORMATS, current_store, session_nbytes
+
 page_element="""
 <style>
 [data-testid="stAppViewContainer"]{
@@ -16,13 +18,13 @@ page_element="""
 st.markdown(page_element, unsafe_allow_html=True)
 
 
-def convert_df_to_csv(df):
-    """Converts the DataFrame to a CSV string for download."""
-    return df.to_csv(index=False).encode('utf-8')
-
 # The page function from the original file
-def page_overview(df):
-    """Displays an overview of the dataset and allows full data download."""
+def page_overview(store):
+    """Displays an overview of the dataset and allows full data download.
+
+    Everything shown comes from the precomputed ``store.stats`` bundle; the frame is not scanned.
+    """
+    stats = store.stats
     st.header("Recipe Dataset Overview 📚")
     st.markdown("---")
     st.markdown("""
@@ -32,44 +34,79 @@ def page_overview(df):
     st.subheader("Dataset Summary")
     
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Recipes", f"{len(df):,}")
-    # Use st.session_state for ingredients count
-    col2.metric("Total Ingredients", f"{len(st.session_state.all_ingredients):,}")
-    col3.metric("Average Steps", f"{df['num_steps'].mean():.1f}")
+    col1.metric("Total Recipes", f"{stats['num_recipes']:,}")
+    col2.metric("Total Ingredients", f"{stats['num_ingredients']:,}")
+    col3.metric("Average Steps", f"{stats['average_steps']:.1f}")
     
     st.subheader("Data Columns Preview")
     
-    preview_cols = ['recipe_title', 'category', 'num_ingredients', 'num_steps', 'Complexity', 'cleaned_ingredients_filtered']
-    df_preview = df[preview_cols].head() 
+    preview = stats['preview']
+    df_preview = pd.DataFrame(preview['data'], columns=preview['columns'])
 
     st.dataframe(df_preview, use_container_width=True)
     
-    csv_full = convert_df_to_csv(df)
-
+    # Generated in chunks on click and cached on disk, not on every render
+    export_format = st.selectbox('Download format', list(EXPORT_FORMATS), key='full_export_format')
     st.download_button(
-        label="Download Full Recipe Dataset (CSV)",
-        data=csv_full,
-        file_name='64k_dishes_full_dataset.csv',
-        mime='text/csv',
+        label=f"Download Full Recipe Dataset ({export_format})",
+        data=lambda: store.export(export_format),
+        file_name=f'64k_dishes_full_dataset.{EXPORT_FORMATS[export_format].extension}',
+        mime=EXPORT_FORMATS[export_format].mime,
         type="primary"
     )
 
+    st.subheader("Recipes per Category")
+    col_categories, col_complexity = st.columns(2)
+    col_categories.bar_chart(pd.Series(stats['category_counts'], name='Recipes'), horizontal=True)
+    col_complexity.bar_chart(
+        pd.Series(stats['complexity_counts'], name='Recipes').reindex(stats['complexity_labels'])
+    )
+
+    st.subheader("Complexity by Category")
+    complexity_by_category = pd.DataFrame.from_dict(stats['complexity_by_category'], orient='index')
+    st.dataframe(complexity_by_category[stats['complexity_labels']], use_container_width=True)
+
+    st.subheader("Ingredient Frequency")
+    col_top, col_histogram = st.columns(2)
+    col_top.markdown("**Most used ingredients** (number of recipes)")
+    col_top.dataframe(
+        pd.DataFrame(stats['top_ingredients'], columns=['Ingredient', 'Recipes']),
+        hide_index=True, use_container_width=True
+    )
+    col_histogram.markdown("**Ingredients by number of recipes using them**")
+    histogram = pd.DataFrame(stats['ingredient_frequency_histogram'], columns=['Recipes using it', 'Ingredients'])
+    col_histogram.bar_chart(histogram, x='Recipes using it', y='Ingredients', sort=False)
+
     with st.expander("Detailed Data Information"):
-        st.write(f"The dataset contains **{len(df)}** recipes across **{df['category'].nunique()}** categories.")
+        st.write(f"The dataset contains **{stats['num_recipes']}** recipes across **{stats['num_categories']}** categories.")
+        if stats['num_raw_ingredients'] != stats['num_ingredients']:
+            st.write(
+                f"The **{stats['num_raw_ingredients']:,}** ingredient names found in the data were normalized "
+                f"to **{stats['num_ingredients']:,}** ingredients (plurals, synonyms and misspellings merged)."
+            )
         st.write("Key columns used for the dashboard:")
-        st.markdown("""
+        # Band bounds as built (measure, quantiles and the cut values of this dataset)
+        bands = stats['complexity_bands']
+        complexity = ', '.join(bands[:-1]) + f', or {bands[-1]}' if len(bands) > 1 else ''.join(bands)
+        st.markdown(f"""
         * **Recipe Title**: The name of the recipe.
         * **Cleaned Ingredients Filtered**: A cleaned, comma-separated list of ingredients, used for filtering.
         * **Directions**: The steps to make the recipe.
         * **Num Steps**: The total number of steps in the recipe, used to calculate **Complexity**.
-        * **Complexity**: Categorized as Simple ($\le$ Q1 steps), Medium ($\le$ Q3 steps), or Complex ($>$ Q3 steps).
+        * **Complexity**: Categorized as {complexity}.
         """)
+        if stats['unparsed_directions']:
+            st.write(f"**{stats['unparsed_directions']:,}** recipes have directions that could not be split into steps; they are shown as raw text.")
+        st.write(
+            f"The dataset and its index take about **{store.nbytes() / 1e6:,.1f} MB**, loaded once and shared "
+            f"by every session; this session's own state is about **{session_nbytes(st.session_state) / 1e3:,.1f} KB**."
+        )
     st.markdown("---")
 
 # Execution for the multi-page app
 if __name__ == '__main__':
-    if 'data' in st.session_state:
-        page_overview(st.session_state.data)
-    else:
+    try:
+        page_overview(current_store())
+    except FileNotFoundError:
         st.error("Data not loaded. Please ensure the main `app.py` runs successfully.")
 
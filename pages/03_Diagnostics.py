@@ -0,0 +1,78 @@
+import pandas as pd
+import streamlit as st
+
+from recipe_engine import current_store, metrics, session_nbytes
+
+# -------------------------------------------------
+# Diagnostics
+# -------------------------------------------------
+# Latency histograms, counters and gauges recorded by perf_metrics across every
+# session of this server process, plus this session's memory.
+
+
+def histogram_table(histograms):
+    """One row per histogram; latencies in milliseconds, sizes in KB."""
+    rows = []
+    for name, summary in sorted(histograms.items()):
+        if name.endswith('_seconds'):
+            label, scale, unit = name[:-len('_seconds')], 1e3, 'ms'
+        elif name.endswith('_bytes'):
+            label, scale, unit = name[:-len('_bytes')], 1e-3, 'KB'
+        else:
+            label, scale, unit = name, 1, ''
+        scaled = {key: summary[key] * scale if summary[key] is not None else None
+                  for key in ('mean', 'p50', 'p95', 'p99', 'max_recent')}
+        rows.append({'Metric': label, 'Unit': unit, 'Count': summary['count'], **scaled})
+    return pd.DataFrame(rows)
+
+
+def page_diagnostics():
+    """Displays the process-wide performance metrics and raw dumps."""
+    st.header("Diagnostics 🩺")
+    st.markdown("---")
+
+    snapshot = metrics.snapshot()
+
+    col1, col2, col3 = st.columns(3)
+    hit_rate = snapshot['gauges'].get('query_cache_hit_rate')
+    col1.metric("Query Cache Hit Rate", f"{hit_rate:.0%}" if hit_rate is not None else "n/a")
+    col2.metric("This Session's State", f"{session_nbytes(st.session_state) / 1e3:,.1f} KB")
+    try:
+        col3.metric("Shared Store", f"{current_store().nbytes() / 1e6:,.1f} MB")
+    except FileNotFoundError:
+        col3.metric("Shared Store", "not loaded")
+
+    st.subheader("Timings and Sizes")
+    if snapshot['histograms']:
+        st.dataframe(histogram_table(snapshot['histograms']), hide_index=True, use_container_width=True)
+    else:
+        st.info("Nothing recorded yet. Use the Recipe Explorer first.")
+
+    col_counters, col_gauges = st.columns(2)
+    col_counters.subheader("Counters")
+    col_counters.dataframe(
+        pd.DataFrame(sorted(snapshot['counters'].items()), columns=['Counter', 'Value']),
+        hide_index=True, use_container_width=True
+    )
+    col_gauges.subheader("Gauges")
+    col_gauges.dataframe(
+        pd.DataFrame(sorted(snapshot['gauges'].items()), columns=['Gauge', 'Value']),
+        hide_index=True, use_container_width=True
+    )
+
+    st.subheader("Raw Dumps")
+    col_json, col_prometheus, col_reset = st.columns(3)
+    col_json.download_button(
+        "Download JSON", data=metrics.to_json, file_name='metrics.json', mime='application/json'
+    )
+    col_prometheus.download_button(
+        "Download Prometheus Text", data=metrics.to_prometheus, file_name='metrics.prom', mime='text/plain'
+    )
+    col_reset.button("Reset Metrics", on_click=metrics.reset)
+    with st.expander("Prometheus text"):
+        st.code(metrics.to_prometheus(), language='text')
+    st.markdown("---")
+
+
+if __name__ == '__main__':
+    page_diagnostics()
@@ -0,0 +1,18 @@
+"""Chef's Compass recipe engine: loading, indexing, querying and favorites, with no Streamlit dependency."""
+
+from .dataset_cache import DEFAULT_OPTIONS, DatasetOptions, load_dataset
+from .engine import DEFAULT_FAVORITES_PATH, QUERY_CACHE_SIZE, RecipeEngine, RecipeSession
+from .favorites_store import DEFAULT_PROFILE, FavoritesStore
+from .pantry_batch import PantryResults
+from .perf_metrics import metrics
+from .recipe_complexity import ComplexityBanding
+from .recipe_export import EXPORT_FORMATS
+from .recipe_index import ALL_CATEGORIES
+from .recipe_store import DEFAULT_DATA_PATH, RecipeStore, current_store, get_store, session_nbytes
+
+__all__ = [
+    'ALL_CATEGORIES', 'DEFAULT_DATA_PATH', 'DEFAULT_FAVORITES_PATH', 'DEFAULT_OPTIONS', 'DEFAULT_PROFILE',
+    'EXPORT_FORMATS', 'QUERY_CACHE_SIZE', 'ComplexityBanding', 'DatasetOptions', 'FavoritesStore', 'PantryResults',
+    'RecipeEngine', 'RecipeSession', 'RecipeStore', 'current_store', 'get_store', 'load_dataset', 'metrics',
+    'session_nbytes',
+]
@@ -0,0 +1,279 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .dataset_stats import compute_statistics
+from .perf_metrics import metrics
+from .ingredient_normalizer import IngredientNormalizer
+from .keyword_index import KeywordIndex
+from .recipe_complexity import DEFAULT_BANDING, MEASURES, ComplexityBanding, complexity_codes, complexity_column
+from .recipe_index import IngredientIndex
+from .recipe_text import RecipeText
+
+# -------------------------------------------------
+# Preprocessed Dataset Artifact
+# -------------------------------------------------
+# Parsing the CSV, banding complexity and building the vocabulary/index is done
+# once per source file. The result is written next to the CSV as a Parquet frame
+# plus memory-mappable .npy index arrays (ingredient, direction text and keyword
+# search), keyed by a hash of the CSV contents, so
+# a cold start only reads the artifact. A changed CSV gets a new key and the
+# artifact is rebuilt automatically.
+
+# Bump whenever the preprocessing below changes (including the normalization
+# tables in ingredient_normalizer) so old artifacts are rebuilt.
+ARTIFACT_FORMAT = 9
+
+CACHE_DIR_NAME = '.cache'
+FRAME_FILE = 'recipes.parquet'
+META_FILE = 'meta.json'
+STATS_FILE = 'stats.json'
+STAMP_FILE = 'source_stamps.json'
+ARTIFACT_ARRAYS = (
+    'complexity_codes', 'raw_to_canonical', 'offsets', 'postings', 'token_counts', 'category_codes', 'indptr', 'indices',
+)
+
+# ``version`` is the artifact name (format + source hash); it identifies the dataset
+# in query cache keys instead of hashing the frame itself. ``stats`` is the
+# precomputed summary from dataset_stats.
+RecipeDataset = namedtuple(
+    'RecipeDataset', ['df', 'all_ingredients', 'all_categories', 'index', 'text', 'keywords', 'stats', 'version']
+)
+
+# Build-time settings; artifacts are keyed by them as well as by the CSV hash.
+# banding: ComplexityBanding used for the Complexity column and row order
+# normalize_ingredients: map raw tokens to canonical ingredients (stemming, synonyms, fuzzy)
+DatasetOptions = namedtuple('DatasetOptions', ['banding', 'normalize_ingredients'])
+
+DEFAULT_OPTIONS = DatasetOptions(DEFAULT_BANDING, True)
+
+
+def default_cache_dir(csv_path):
+    """Artifacts live in a hidden folder next to the source CSV."""
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME)
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks so large CSVs never sit in memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_hash(csv_path, cache_dir):
+    """Content hash of the CSV, reusing the last hash while size and mtime are unchanged."""
+    stat = os.stat(csv_path)
+    stamp = f'{stat.st_size}:{stat.st_mtime_ns}'
+    stamp_path = os.path.join(cache_dir, STAMP_FILE)
+    key = os.path.abspath(csv_path)
+
+    try:
+        with open(stamp_path) as handle:
+            stamps = json.load(handle)
+    except (OSError, ValueError):
+        stamps = {}
+
+    entry = stamps.get(key)
+    if entry and entry['stamp'] == stamp:
+        return entry['sha256']
+
+    digest = hash_file(csv_path)
+    stamps[key] = {'stamp': stamp, 'sha256': digest}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(stamp_path, 'w') as handle:
+        json.dump(stamps, handle)
+    return digest
+
+
+def options_tag(options):
+    """Short stable id of the build options."""
+    return hashlib.sha256(repr(tuple(options)).encode('utf-8')).hexdigest()[:8]
+
+
+def artifact_dir(csv_path, cache_dir, digest, options=DEFAULT_OPTIONS):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, f'{stem}-v{ARTIFACT_FORMAT}-{digest[:16]}-{options_tag(options)}')
+
+
+def order_by_complexity(df, banding):
+    """Adds the Complexity column and stably reorders the rows by it."""
+    codes = complexity_codes(df, banding)
+    order = np.argsort(codes, kind='stable')
+    df = df.iloc[order].reset_index(drop=True)
+    df['Complexity'] = complexity_column(codes[order], banding.labels)
+    return df
+
+
+def build_dataset(csv_path, options=DEFAULT_OPTIONS):
+    """Loads and preprocesses the recipe CSV. Returns the RecipeDataset fields up to ``stats`` as a tuple.
+
+    Rows are stored in complexity order (stable within a band), so row positions, posting
+    lists and therefore every query result come out pre-sorted by complexity.
+    """
+    df = order_by_complexity(pd.read_csv(csv_path), options.banding)
+
+    normalizer = IngredientNormalizer() if options.normalize_ingredients else None
+    index = IngredientIndex.build(df, normalizer)
+
+    # The sidebar vocabulary is the index vocabulary (canonical names when normalizing)
+    all_ingredients = list(index.vocabulary)
+    all_categories = sorted(list(df['category'].unique()))
+
+    text = RecipeText.build(df)
+    keywords = KeywordIndex.build(df['recipe_title'], text)
+    return df, all_ingredients, all_categories, index, text, keywords, compute_statistics(df, index, text, options.banding)
+
+
+def write_artifact(path, digest, df, all_ingredients, all_categories, index, text, keywords, stats):
+    """Writes the artifact into a temp folder and renames it into place atomically.
+
+    When another process finished the same artifact first, its copy is kept and this one discarded.
+    """
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.building-', dir=parent)
+    try:
+        # Complexity is kept as int8 codes and rebuilt as a Categorical on load
+        df.drop(columns=['Complexity']).to_parquet(os.path.join(staging, FRAME_FILE), index=False)
+        arrays = {
+            'complexity_codes': np.asarray(df['Complexity'].cat.codes, dtype=np.int8),
+            'offsets': index.offsets,
+            'postings': index.postings,
+            'token_counts': index.token_counts,
+            'raw_to_canonical': index.raw_to_canonical,
+            'category_codes': index.category_codes,
+            'indptr': index.matrix.indptr,
+            'indices': index.matrix.indices,
+        }
+        arrays.update(text.arrays())
+        arrays.update(keywords.arrays())
+        for name, values in arrays.items():
+            np.save(os.path.join(staging, f'{name}.npy'), values)
+        meta = {
+            'format': ARTIFACT_FORMAT,
+            'source_sha256': digest,
+            'num_recipes': len(df),
+            'all_ingredients': all_ingredients,
+            'all_categories': all_categories,
+            'index_vocabulary': index.vocabulary,
+            'index_categories': index.categories,
+            'raw_vocabulary': index.raw_vocabulary,
+            'normalized': index.normalizer is not None,
+            'complexity_labels': list(df['Complexity'].cat.categories),
+            'unparsed_directions': text.unparsed_count,
+            'keyword_terms': keywords.terms,
+        }
+        with open(os.path.join(staging, META_FILE), 'w') as handle:
+            json.dump(meta, handle)
+        with open(os.path.join(staging, STATS_FILE), 'w') as handle:
+            json.dump(stats, handle)
+        try:
+            os.replace(staging, path)
+        except OSError:
+            # Same CSV hash and options, so the existing artifact has the same contents
+            if not os.path.isdir(path):
+                raise
+            shutil.rmtree(staging, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def read_artifact(path):
+    """Reads an artifact written by write_artifact into a RecipeDataset; index arrays are memory-mapped."""
+    with open(os.path.join(path, META_FILE)) as handle:
+        meta = json.load(handle)
+    with open(os.path.join(path, STATS_FILE)) as handle:
+        stats = json.load(handle)
+    df = pd.read_parquet(os.path.join(path, FRAME_FILE))
+    arrays = {
+        name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        for name in ARTIFACT_ARRAYS + RecipeText.ARRAYS + KeywordIndex.ARRAYS
+    }
+    df['Complexity'] = complexity_column(arrays['complexity_codes'], meta['complexity_labels'])
+
+    vocabulary = meta['index_vocabulary']
+    matrix = sparse.csr_matrix(
+        (np.ones(len(arrays['indices']), dtype=np.int32), arrays['indices'], arrays['indptr']),
+        shape=(meta['num_recipes'], len(vocabulary)),
+    )
+    index = IngredientIndex(
+        vocabulary,
+        arrays['offsets'],
+        arrays['postings'],
+        matrix,
+        arrays['token_counts'],
+        meta['index_categories'],
+        arrays['category_codes'],
+        meta['raw_vocabulary'],
+        arrays['raw_to_canonical'],
+        IngredientNormalizer() if meta['normalized'] else None,
+    )
+    text = RecipeText(*(arrays[name] for name in RecipeText.ARRAYS))
+    keywords = KeywordIndex(meta['keyword_terms'], *(arrays[name] for name in KeywordIndex.ARRAYS))
+    return RecipeDataset(
+        df, meta['all_ingredients'], meta['all_categories'], index, text, keywords, stats, os.path.basename(path)
+    )
+
+
+def remove_stale_artifacts(csv_path, cache_dir, keep, options=DEFAULT_OPTIONS):
+    """Deletes older artifacts built from the same CSV path with the same options.
+
+    Artifacts of other options belong to other processes (e.g. the app with custom
+    banding next to the API server) and are left alone.
+    """
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    tag = options_tag(options)
+    for name in os.listdir(cache_dir):
+        candidate = os.path.join(cache_dir, name)
+        if (name.startswith(f'{stem}-v') and name.endswith(f'-{tag}') and candidate != keep
+                and os.path.isdir(candidate)):
+            shutil.rmtree(candidate, ignore_errors=True)
+
+
+def load_dataset(csv_path, cache_dir=None, options=DEFAULT_OPTIONS):
+    """Returns the RecipeDataset for a CSV, building the artifact when missing or stale.
+
+    The artifact is keyed by the CSV hash and the build options, so changing either
+    rebuilds it. Raises FileNotFoundError when the CSV does not exist.
+    """
+    cache_dir = cache_dir or default_cache_dir(csv_path)
+    digest = source_hash(csv_path, cache_dir)
+    path = artifact_dir(csv_path, cache_dir, digest, options)
+
+    if os.path.isdir(path):
+        with metrics.timer('artifact_read_seconds'):
+            return read_artifact(path)
+
+    with metrics.timer('artifact_build_seconds'):
+        write_artifact(path, digest, *build_dataset(csv_path, options))
+        remove_stale_artifacts(csv_path, cache_dir, keep=path, options=options)
+    with metrics.timer('artifact_read_seconds'):
+        return read_artifact(path)
+
+
+def add_build_arguments(parser):
+    """Command-line arguments shared by the artifact build entry points."""
+    parser.add_argument('csv_path', nargs='?', default='data/deduplicated_recipes_with_complexity.csv')
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--complexity-measure', choices=sorted(MEASURES), default=DEFAULT_BANDING.measure)
+    parser.add_argument('--complexity-quantiles', type=float, nargs='+', default=list(DEFAULT_BANDING.quantiles))
+    parser.add_argument('--complexity-labels', nargs='+', default=list(DEFAULT_BANDING.labels))
+    parser.add_argument('--raw-ingredients', action='store_true', help='skip ingredient normalization')
+
+
+def options_from_arguments(args):
+    return DatasetOptions(
+        ComplexityBanding(args.complexity_measure, tuple(args.complexity_quantiles), tuple(args.complexity_labels)),
+        not args.raw_ingredients,
+    )
+
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from .recipe_complexity import band_edges, describe_bands
+
+# -------------------------------------------------
+# Precomputed Dataset Statistics
+# -------------------------------------------------
+# Everything the Overview page shows is computed once when the artifact is built
+# and stored next to it as plain JSON, so opening the page never touches the
+# frame. Recompute by rebuilding the artifact (bump ARTIFACT_FORMAT when the
+# bundle's contents change).
+
+PREVIEW_COLUMNS = ['recipe_title', 'category', 'num_ingredients', 'num_steps', 'Complexity', 'cleaned_ingredients_filtered']
+PREVIEW_ROWS = 5
+# Rows are stored simplest first, so the preview is a fixed random sample rather than the head
+PREVIEW_SEED = 0
+TOP_INGREDIENTS = 25
+
+
+def _frequency_histogram(frequencies):
+    """[[bucket label, number of ingredients], ...] of recipes per ingredient in doubling buckets."""
+    if not len(frequencies):
+        return []
+    buckets = np.floor(np.log2(np.maximum(frequencies, 1))).astype(np.int64)
+    histogram = []
+    for bucket, count in enumerate(np.bincount(buckets)):
+        low, high = 2 ** bucket, 2 ** (bucket + 1) - 1
+        label = f'{low:,}' if low == high else f'{low:,}–{high:,}'
+        histogram.append([label, int(count)])
+    return histogram
+
+
+def compute_statistics(df, index, text, banding):
+    """JSON-serializable summary of the prepared dataset, shown by the Overview page."""
+    frequencies = np.diff(np.asarray(index.offsets))
+    top = np.lexsort((np.arange(len(frequencies)), -frequencies))[:TOP_INGREDIENTS]
+
+    by_category = pd.crosstab(df['category'], df['Complexity'], dropna=False)
+    sample = np.random.default_rng(PREVIEW_SEED).choice(len(df), min(PREVIEW_ROWS, len(df)), replace=False)
+    preview = df[[col for col in PREVIEW_COLUMNS if col in df.columns]].iloc[np.sort(sample)]
+
+    return {
+        'num_recipes': int(len(df)),
+        'num_ingredients': int(len(index.vocabulary)),
+        'num_raw_ingredients': int(len(index.raw_vocabulary)),
+        'num_categories': int(df['category'].nunique()),
+        'average_steps': float(df['num_steps'].mean()) if len(df) else 0.0,
+        'average_ingredients': float(df['num_ingredients'].mean()) if len(df) else 0.0,
+        'unparsed_directions': int(text.unparsed_count),
+        'complexity_labels': [str(label) for label in df['Complexity'].cat.categories],
+        'complexity_bands': describe_bands(banding, band_edges(df, banding)) if len(df) else [],
+        'complexity_counts': {
+            str(label): int(count) for label, count in df['Complexity'].value_counts(sort=False).items()
+        },
+        'category_counts': {str(cat): int(count) for cat, count in df['category'].value_counts().items()},
+        'complexity_by_category': {
+            str(cat): {str(label): int(count) for label, count in row.items()}
+            for cat, row in by_category.iterrows()
+        },
+        'top_ingredients': [[index.vocabulary[i], int(frequencies[i])] for i in top],
+        'ingredient_frequency_histogram': _frequency_histogram(frequencies),
+        # JSON round trip turns numpy scalars, categoricals and NaN into plain values
+        'preview': json.loads(preview.to_json(orient='split', index=False)),
+    }
@@ -0,0 +1,206 @@
+import sys
+
+import numpy as np
+
+from .dataset_cache import DEFAULT_OPTIONS
+from .favorites_store import DEFAULT_PROFILE, FavoritesStore, load_favorites
+from .incremental_query import IncrementalQuery
+from .keyword_index import contains_sorted
+from .pantry_batch import DEFAULT_BLOCK_PANTRIES, score_pantries
+from .perf_metrics import metrics
+from .query_cache import DEFAULT_MAX_ENTRIES, QueryCache, normalize_query
+from .recipe_index import ALL_CATEGORIES
+from .recipe_ranking import rank_top_k
+from .recipe_store import DEFAULT_DATA_PATH, add_reload_listener, estimate_nbytes, get_store, watch_store
+
+# -------------------------------------------------
+# Recipe Engine
+# -------------------------------------------------
+# Loading, filtering and favorites without any UI dependency, so the same code
+# path serves the Streamlit pages, scripts and benchmarks. A RecipeEngine is
+# process-wide (the shared store, the query result cache, the favorites file);
+# a RecipeSession is one user's state on top of it (the store version in use,
+# favorites as row ids, the running match counts and the latest result).
+# Errors are raised, never displayed: callers decide how to report them.
+
+DEFAULT_FAVORITES_PATH = 'data/favorites.sqlite3'
+
+# Maximum number of distinct filter queries kept in the shared result cache
+QUERY_CACHE_SIZE = DEFAULT_MAX_ENTRIES
+
+
+class RecipeEngine:
+    """Process-wide access to one dataset: the latest store, cached filtering and the favorites file."""
+
+    def __init__(self, data_path=DEFAULT_DATA_PATH, options=DEFAULT_OPTIONS, favorites_path=DEFAULT_FAVORITES_PATH,
+                 query_cache_size=QUERY_CACHE_SIZE, watch=True):
+        self.data_path = data_path
+        self.options = options
+        self.favorites_path = favorites_path
+        # Reload the store in the background when the CSV or artifact changes
+        self.watch = watch
+        self.query_cache = QueryCache(query_cache_size)
+        self._favorites = None
+        # Results of replaced dataset versions can never be requested again
+        add_reload_listener(lambda old_store, new_store: self.query_cache.drop_version(old_store.version))
+        metrics.register_gauge('query_cache_hit_rate', lambda: self.query_cache.stats()['hit_rate'])
+        metrics.register_gauge('query_cache_entries', lambda: self.query_cache.stats()['entries'])
+
+    def store(self):
+        """The latest shared, read-only RecipeStore (loaded once per process). Raises FileNotFoundError."""
+        store = get_store(self.data_path, self.options)
+        if self.watch:
+            watch_store(self.data_path, self.options)
+        return store
+
+    @property
+    def favorites(self):
+        """The SQLite favorites file, opened on first use."""
+        if self._favorites is None:
+            self._favorites = FavoritesStore(self.favorites_path)
+        return self._favorites
+
+    @metrics.timed('filter_recipes_seconds')
+    def filter(self, selected_ingredients, threshold_percent, selected_category, top_k=None, store=None,
+               matcher=None, keywords=''):
+        """Filters the recipes based on selected category, ingredients, match threshold and keywords.
+
+        Returns the matching row positions in ``store`` (default: the latest) as a read-only int32
+        array, in complexity order, or with ``top_k`` only the best ``top_k`` recipes ranked by
+        match score (by keyword relevance when searching keywords). Results are cached under the
+        store's version token and the normalized query, so the DataFrame itself is never hashed or
+        copied. On a cache miss, a session's IncrementalQuery ``matcher`` only applies what changed
+        since its previous query.
+        """
+        store = store or self.store()
+        key = normalize_query(
+            store.version, selected_ingredients, threshold_percent, selected_category, top_k, keywords
+        )
+
+        row_ids = self.query_cache.get(key)
+        if row_ids is None:
+            metrics.increment('query_cache_misses')
+            keyword_matches = store.keywords.search(keywords) if keywords else None
+            if keyword_matches is not None:
+                row_ids = self._keyword_filter(
+                    store, keyword_matches, selected_ingredients, threshold_percent, selected_category, top_k,
+                    matcher
+                )
+            elif top_k:
+                row_ids, _ = rank_top_k(
+                    store.index, store.complexity_codes, len(store.complexity_labels),
+                    selected_ingredients, threshold_percent, selected_category, top_k, matcher=matcher
+                )
+            else:
+                row_ids = (matcher or store.index).query(selected_ingredients, threshold_percent, selected_category)
+            row_ids.setflags(write=False)
+            self.query_cache.put(key, row_ids)
+        else:
+            metrics.increment('query_cache_hits')
+
+        return row_ids
+
+    @staticmethod
+    def _keyword_filter(store, keyword_matches, selected_ingredients, threshold_percent, selected_category, top_k,
+                        matcher):
+        """Keyword hits intersected with the ingredient (or, without ingredients, category) result rows."""
+        rows, scores = keyword_matches
+        if selected_ingredients:
+            allowed = (matcher or store.index).query(selected_ingredients, threshold_percent, selected_category)
+        else:
+            allowed = store.index.rows_in_category(selected_category)
+        keep = contains_sorted(rows, allowed)
+        rows, scores = rows[keep], scores[keep]
+        if top_k:
+            # Best BM25 score first, ties in complexity order
+            rows = rows[np.lexsort((rows, -scores))[:top_k]]
+        return rows.astype(np.int32)
+
+    @metrics.timed('score_pantries_seconds')
+    def score_pantries(self, pantries, threshold_percent, selected_category=ALL_CATEGORIES, k=10, workers=None,
+                       block_size=DEFAULT_BLOCK_PANTRIES, store=None):
+        """Count and top ``k`` recipe row positions for every pantry at once (see pantry_batch)."""
+        store = store or self.store()
+        return score_pantries(
+            store.index, store.complexity_codes, len(store.complexity_labels), pantries, threshold_percent,
+            selected_category, k, workers=workers, block_size=block_size
+        )
+
+    def session(self, profile=DEFAULT_PROFILE):
+        """A user's session; favorites are saved per ``profile`` (the default one suits single-user scripts)."""
+        return RecipeSession(self, profile)
+
+
+class RecipeSession:
+    """One user's view: pinned store version, favorites (ordered set of row ids) and the latest result."""
+
+    def __init__(self, engine, profile=DEFAULT_PROFILE):
+        self.engine = engine
+        self.profile = profile
+        # The store version the results were computed against, until the next filter action
+        self.store = engine.store()
+        self.favorites = load_favorites(engine.favorites, self.store.title_ids, profile)
+        self.matcher = IncrementalQuery(self.store.index)
+        self.result_ids = None
+        self.result_ranked = False
+        # Identifies the result set for cached exports
+        self.result_query = None
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sum(
+            estimate_nbytes(value) for value in (self.favorites, self.result_ids, self.result_query)
+        ) + sys.getsizeof(self.matcher)
+
+    def newer_store_available(self):
+        return get_store(self.engine.data_path, self.engine.options) is not self.store
+
+    def adopt_latest_store(self):
+        """Switches to the newest store version, carrying favorites over by title."""
+        latest = self.engine.store()
+        old = self.store
+        if latest is not old:
+            self.favorites = {
+                latest.title_ids[old.titles[row_id]]: None
+                for row_id in self.favorites
+                if old.titles[row_id] in latest.title_ids
+            }
+            self.matcher = IncrementalQuery(latest.index)
+            self.store = latest
+        return latest
+
+    def apply_filters(self, selected_ingredients, threshold_percent, selected_category, top_k=None, keywords=''):
+        """Runs the query against the newest store; a filter action is when a session moves to it."""
+        store = self.adopt_latest_store()
+        self.result_ids = self.engine.filter(
+            selected_ingredients, threshold_percent, selected_category, top_k, store=store, matcher=self.matcher,
+            keywords=keywords
+        )
+        self.result_ranked = top_k is not None
+        self.result_query = normalize_query(
+            None, selected_ingredients, threshold_percent, selected_category, top_k, keywords
+        )
+        return self.result_ids
+
+    def add_favorite(self, row_id):
+        """Returns False when the recipe was already a favorite."""
+        if row_id in self.favorites:
+            return False
+        self.favorites[row_id] = None
+        self.engine.favorites.add(self.store.titles[row_id], self.profile)
+        return True
+
+    def add_favorites(self, row_ids):
+        """Adds several recipes in one saved-list transaction; returns the row ids that were new."""
+        new_ids = list(dict.fromkeys(row_id for row_id in row_ids if row_id not in self.favorites))
+        for row_id in new_ids:
+            self.favorites[row_id] = None
+        if new_ids:
+            self.engine.favorites.add_many(self.store.titles[new_ids].tolist(), self.profile)
+        return new_ids
+
+    def remove_favorite(self, row_id):
+        """Returns False when the recipe was not a favorite."""
+        was_favorite = row_id in self.favorites
+        self.favorites.pop(row_id, None)
+        self.engine.favorites.remove(self.store.titles[row_id], self.profile)
+        return was_favorite
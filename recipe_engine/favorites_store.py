@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import threading
+
+# -------------------------------------------------
+# Persistent Favorites
+# -------------------------------------------------
+# Favorites are kept in a small SQLite file so they survive restarts. Recipes are
+# stored by title, the one key that stays valid when the dataset is rebuilt
+# (row positions follow complexity order and change with the data). Sessions
+# hold them as an insertion-ordered dict of row ids, i.e. an ordered set, so
+# membership, add and remove are O(1) and rendering only visits the favorites.
+
+DEFAULT_PROFILE = 'default'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS favorites (
+    position INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile TEXT NOT NULL,
+    recipe_title TEXT NOT NULL,
+    UNIQUE (profile, recipe_title)
+)
+"""
+
+
+class FavoritesStore:
+    """Ordered favorite recipe titles per profile, persisted in SQLite. Safe to share across threads."""
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute(_SCHEMA)
+
+    def titles(self, profile=DEFAULT_PROFILE):
+        """Favorite titles in the order they were added."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT recipe_title FROM favorites WHERE profile = ? ORDER BY position', (profile,)
+            ).fetchall()
+        return [title for (title,) in rows]
+
+    def add(self, recipe_title, profile=DEFAULT_PROFILE):
+        """Returns False when the title was already a favorite."""
+        with self._lock:
+            cursor = self._connection.execute(
+                'INSERT OR IGNORE INTO favorites (profile, recipe_title) VALUES (?, ?)', (profile, recipe_title)
+            )
+        return cursor.rowcount > 0
+
+    def add_many(self, recipe_titles, profile=DEFAULT_PROFILE):
+        """Adds several titles in one transaction, skipping existing favorites."""
+        with self._lock, self._connection:
+            self._connection.execute('BEGIN')
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO favorites (profile, recipe_title) VALUES (?, ?)',
+                [(profile, title) for title in recipe_titles]
+            )
+
+    def remove(self, recipe_title, profile=DEFAULT_PROFILE):
+        """Returns False when the title was not a favorite."""
+        with self._lock:
+            cursor = self._connection.execute(
+                'DELETE FROM favorites WHERE profile = ? AND recipe_title = ?', (profile, recipe_title)
+            )
+        return cursor.rowcount > 0
+
+
+def load_favorites(favorites_store, title_ids, profile=DEFAULT_PROFILE):
+    """Ordered set {row id: None} of the saved favorites that exist in the current dataset."""
+    return {
+        title_ids[title]: None
+        for title in favorites_store.titles(profile)
+        if title in title_ids
+    }
@@ -0,0 +1,121 @@
+import sys
+
+import numpy as np
+
+from .recipe_index import ALL_CATEGORIES, EMPTY_ROWS
+
+# -------------------------------------------------
+# Incremental Query Refinement
+# -------------------------------------------------
+# Sessions usually refine a query one step at a time: one more ingredient, one
+# less, the threshold slider moved by 5%, another category. Each session keeps
+# the match counts of its current ingredient selection as a sparse pair of
+# arrays (candidate rows ascending, matched counts). Adding or removing an
+# ingredient only applies that ingredient's posting list to those arrays;
+# threshold and category changes only re-mask them. Results are identical to
+# IngredientIndex.query.
+
+# Rows whose count dropped to zero are compacted away once they make up this share
+COMPACT_SHARE = 0.5
+
+
+class IncrementalQuery:
+    """Per-session match counts for the current ingredient selection over a shared IngredientIndex."""
+
+    def __init__(self, index):
+        self.index = index
+        # Selected name -> canonical ingredient id (None when it resolves to nothing)
+        self.name_ids = {}
+        # Canonical id -> number of selected names resolving to it
+        self.id_refs = {}
+        self.rows = EMPTY_ROWS
+        self.counts = np.empty(0, dtype=np.int32)
+        self.zeros = 0
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.rows.nbytes + self.counts.nbytes + sys.getsizeof(self.name_ids)
+
+    @property
+    def num_selected(self):
+        """Distinct selected ingredients, the denominator of the match share."""
+        return len(self.id_refs) + sum(1 for ingredient_id in self.name_ids.values() if ingredient_id is None)
+
+    def update(self, selected_ingredients):
+        """Applies only the ingredients added or removed since the previous selection."""
+        selected = set(selected_ingredients)
+        for name in [name for name in self.name_ids if name not in selected]:
+            ingredient_id = self.name_ids.pop(name)
+            if ingredient_id is not None:
+                self.id_refs[ingredient_id] -= 1
+                if not self.id_refs[ingredient_id]:
+                    del self.id_refs[ingredient_id]
+                    self._remove_postings(self.index.posting_list(ingredient_id))
+        for name in selected - self.name_ids.keys():
+            ingredient_id = self.index.resolve(name)
+            self.name_ids[name] = ingredient_id
+            if ingredient_id is not None:
+                self.id_refs[ingredient_id] = self.id_refs.get(ingredient_id, 0) + 1
+                if self.id_refs[ingredient_id] == 1:
+                    self._add_postings(self.index.posting_list(ingredient_id))
+
+    def _add_postings(self, postings):
+        if not len(postings):
+            return
+        position = np.searchsorted(self.rows, postings)
+        known = position < len(self.rows)
+        known[known] = self.rows[position[known]] == postings[known]
+        if np.all(known):
+            self.zeros -= int(np.count_nonzero(self.counts[position] == 0))
+            self.counts[position] += 1
+            return
+
+        # New candidates: merge the two ascending row arrays in one linear pass. A new row lands
+        # after every existing row below it (its searchsorted position) and every new row before it.
+        self.zeros -= int(np.count_nonzero(self.counts[position[known]] == 0))
+        self.counts[position[known]] += 1
+        new = ~known
+        new_rows = postings[new]
+        target = position[new] + np.arange(len(new_rows))
+        existing = np.ones(len(self.rows) + len(new_rows), dtype=bool)
+        existing[target] = False
+        rows = np.empty(len(existing), dtype=self.rows.dtype)
+        counts = np.ones(len(existing), dtype=np.int32)
+        rows[target] = new_rows
+        rows[existing] = self.rows
+        counts[existing] = self.counts
+        self.rows, self.counts = rows, counts
+
+    def _remove_postings(self, postings):
+        if not len(postings):
+            return
+        position = np.searchsorted(self.rows, postings)
+        self.counts[position] -= 1
+        self.zeros += int(np.count_nonzero(self.counts[position] == 0))
+        if self.zeros > COMPACT_SHARE * len(self.rows):
+            keep = self.counts > 0
+            self.rows, self.counts = self.rows[keep], self.counts[keep]
+            self.zeros = 0
+
+    def matching_candidates(self, selected_ingredients, threshold_percent, selected_category):
+        """Same result as IngredientIndex.matching_candidates, from the session's running counts."""
+        self.update(selected_ingredients)
+        num_selected = self.num_selected
+        if not num_selected:
+            return EMPTY_ROWS, EMPTY_ROWS, 0
+
+        keep = (self.counts > 0) & (self.counts / num_selected >= threshold_percent / 100.0)
+
+        if threshold_percent == 100:
+            keep &= self.index.token_counts[self.rows] == num_selected
+
+        if selected_category != ALL_CATEGORIES:
+            keep &= self.index.category_codes[self.rows] == self.index.category_ids.get(selected_category, -2)
+
+        return self.rows[keep], self.counts[keep], num_selected
+
+    def query(self, selected_ingredients, threshold_percent, selected_category):
+        """Same result as IngredientIndex.query."""
+        if not selected_ingredients or threshold_percent <= 0:
+            # These never depend on the match counts; keep the counts for the next refinement.
+            return self.index.query(selected_ingredients, threshold_percent, selected_category)
+        return self.matching_candidates(selected_ingredients, threshold_percent, selected_category)[0]
@@ -0,0 +1,210 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+# -------------------------------------------------
+# Ingredient Normalization
+# -------------------------------------------------
+# Runs once at index build time and maps every raw ingredient token to a
+# canonical ingredient id:
+#   1. light cleanup (lowercase, collapse whitespace)
+#   2. plural stemming of the last word ("roma tomatoes" -> "roma tomato")
+#   3. a synonym table ("roma tomato" -> "tomato", "scallion" -> "green onion")
+#   4. trigram fuzzy matching that folds rare spellings ("tomatoe") into a
+#      frequent canonical form with the same number of words, a few character
+#      edits away; added or different words ("white chocolate chip") are real
+#      variants and only merge through the synonym table
+# The same steps resolve free-text names at query time.
+
+# Canonical form for common variants (keys and values are already singular)
+SYNONYMS = {
+    'scallion': 'green onion',
+    'spring onion': 'green onion',
+    'roma tomato': 'tomato',
+    'plum tomato': 'tomato',
+    'garbanzo bean': 'chickpea',
+    'garbanzo': 'chickpea',
+    'coriander leaf': 'cilantro',
+    'fresh cilantro': 'cilantro',
+    'courgette': 'zucchini',
+    'aubergine': 'eggplant',
+    'icing sugar': 'powdered sugar',
+    'confectioners sugar': 'powdered sugar',
+    "confectioners' sugar": 'powdered sugar',
+    'caster sugar': 'sugar',
+    'granulated sugar': 'sugar',
+    'white sugar': 'sugar',
+    'all-purpose flour': 'flour',
+    'all purpose flour': 'flour',
+    'extra virgin olive oil': 'olive oil',
+    'extra-virgin olive oil': 'olive oil',
+    'bicarbonate of soda': 'baking soda',
+    'capsicum': 'bell pepper',
+    'prawn': 'shrimp',
+}
+
+# Plurals the suffix rules below would get wrong
+IRREGULAR_PLURALS = {
+    'leaves': 'leaf',
+    'halves': 'half',
+    'loaves': 'loaf',
+    'knives': 'knife',
+    'cookies': 'cookie',
+    'pies': 'pie',
+    'brownies': 'brownie',
+    'smoothies': 'smoothie',
+    'veggies': 'veggie',
+    'calories': 'calorie',
+    'geese': 'goose',
+    'mice': 'mouse',
+}
+
+# Words that look plural but are not
+UNINFLECTED = {
+    'molasses', 'hummus', 'couscous', 'asparagus', 'citrus', 'swiss', 'grits',
+    'watercress', 'lemongrass', 'bass', 'anise', 'series', 'species', 'chassis',
+    'schnapps', 'quinoa', 'swordfish', 'shellfish', 'fish', 'sheep', 'cress',
+}
+
+FUZZY_THRESHOLD = 0.65
+# Only forms seen this many times or fewer are folded into a more frequent form
+FUZZY_MAX_COUNT = 2
+# ... and only when at most this many single-character edits apart
+FUZZY_MAX_EDITS = 2
+# Most similar names checked for a misspelling match
+FUZZY_CANDIDATES = 5
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def singularize(word):
+    """Rule-based singular form of one lowercase word."""
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if word in UNINFLECTED or len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith('oes'):
+        return word[:-2]
+    if word.endswith(('ches', 'shes', 'sses', 'xes', 'zes')):
+        return word[:-2]
+    if word.endswith(('ss', 'us', 'is')):
+        return word
+    if word.endswith('s'):
+        return word[:-1]
+    return word
+
+
+def edit_distance(left, right, limit):
+    """Levenshtein distance, or ``limit + 1`` as soon as it must exceed ``limit``."""
+    if abs(len(left) - len(right)) > limit:
+        return limit + 1
+    previous = list(range(len(right) + 1))
+    for i, char in enumerate(left, 1):
+        current = [i]
+        for j, other in enumerate(right, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def trigrams(text):
+    """Set of padded character trigrams used for fuzzy matching."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram -> name ids, answering "most similar name" by Jaccard similarity."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.name_trigrams = [trigrams(name) for name in self.names]
+        self.postings = {}
+        for name_id, grams in enumerate(self.name_trigrams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(name_id)
+
+    def similar(self, text, limit=5, min_similarity=0.0):
+        """[(similarity, name_id), ...] best first."""
+        grams = trigrams(text)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        scored = []
+        for name_id, count in shared.items():
+            similarity = count / (len(grams) + len(self.name_trigrams[name_id]) - count)
+            if similarity >= min_similarity:
+                scored.append((similarity, name_id))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:limit]
+
+    def best(self, text, min_similarity):
+        """Id of the most similar name, or None below ``min_similarity``."""
+        matches = self.similar(text, limit=1, min_similarity=min_similarity)
+        return matches[0][1] if matches else None
+
+
+class IngredientNormalizer:
+    """Maps raw ingredient strings to canonical names."""
+
+    def __init__(self, synonyms=SYNONYMS, fuzzy_threshold=FUZZY_THRESHOLD, fuzzy_max_count=FUZZY_MAX_COUNT,
+                 fuzzy_max_edits=FUZZY_MAX_EDITS):
+        self.synonyms = synonyms
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_max_count = fuzzy_max_count
+        self.fuzzy_max_edits = fuzzy_max_edits
+
+    def canonical_form(self, raw):
+        """Cleanup, last-word stemming and synonym lookup (no fuzzy step)."""
+        name = _WHITESPACE.sub(' ', str(raw).lower()).strip()
+        if name in self.synonyms:
+            return self.synonyms[name]
+        words = name.split(' ')
+        words[-1] = singularize(words[-1])
+        name = ' '.join(words)
+        return self.synonyms.get(name, name)
+
+    def is_misspelling(self, form, name):
+        """True when ``form`` reads as a typo of ``name``: same word count, few character edits."""
+        return (
+            form.count(' ') == name.count(' ')
+            and edit_distance(form, name, self.fuzzy_max_edits) <= self.fuzzy_max_edits
+        )
+
+    def fuzzy_match(self, fuzzy, form):
+        """Id of the most similar name in TrigramIndex ``fuzzy`` that ``form`` misspells, or None."""
+        for _, name_id in fuzzy.similar(form, FUZZY_CANDIDATES, self.fuzzy_threshold):
+            if self.is_misspelling(form, fuzzy.names[name_id]):
+                return name_id
+        return None
+
+    def build_mapping(self, raw_vocabulary, raw_counts):
+        """
+        Returns (canonical vocabulary sorted, int32 array mapping raw id -> canonical id).
+        ``raw_counts`` is how often each raw token occurs; rare forms may be folded into
+        a similar frequent form.
+        """
+        forms = [self.canonical_form(raw) for raw in raw_vocabulary]
+        form_counts = Counter()
+        for form, count in zip(forms, raw_counts):
+            form_counts[form] += int(count)
+
+        frequent = sorted(form for form, count in form_counts.items() if count > self.fuzzy_max_count)
+        folded = {}
+        if frequent:
+            fuzzy = TrigramIndex(frequent)
+            for form, count in form_counts.items():
+                if count <= self.fuzzy_max_count:
+                    match = self.fuzzy_match(fuzzy, form)
+                    if match is not None:
+                        folded[form] = frequent[match]
+
+        forms = [folded.get(form, form) for form in forms]
+        vocabulary = sorted(set(forms))
+        ids = {name: i for i, name in enumerate(vocabulary)}
+        return vocabulary, np.array([ids[form] for form in forms], dtype=np.int32)
@@ -0,0 +1,54 @@
+import numpy as np
+
+# -------------------------------------------------
+# Type-ahead Ingredient Search
+# -------------------------------------------------
+# The sidebar used to ship the whole ingredient vocabulary to the multiselect on
+# every rerun. Instead, every word of every ingredient name goes into one sorted
+# array; a typed prefix is a binary-searched range of that array, and the matching
+# ingredients are ranked by how many recipes use them. Only the top few reach the
+# browser.
+
+DEFAULT_LIMIT = 50
+
+
+class IngredientSearch:
+    """Word-prefix completion over an ingredient vocabulary, most used ingredients first."""
+
+    def __init__(self, vocabulary, frequencies):
+        self.vocabulary = list(vocabulary)
+        self.frequencies = np.asarray(frequencies, dtype=np.int64)
+
+        words, ids = [], []
+        for ingredient_id, name in enumerate(self.vocabulary):
+            for word in set(name.split()):
+                words.append(word)
+                ids.append(ingredient_id)
+        order = np.argsort(np.array(words, dtype=object), kind='stable')
+        self.words = np.array(words, dtype=object)[order]
+        self.word_ids = np.array(ids, dtype=np.int32)[order]
+        self.popular = np.lexsort((np.arange(len(self.vocabulary)), -self.frequencies)).astype(np.int32)
+
+    @classmethod
+    def from_index(cls, index):
+        """Ranks by posting list length, i.e. the number of recipes using each ingredient."""
+        return cls(index.vocabulary, np.diff(index.offsets))
+
+    def matching_ids(self, prefix):
+        """Ids of the ingredients with a word starting with each word of ``prefix``."""
+        ids = None
+        for word in prefix.lower().split():
+            first = np.searchsorted(self.words, word, side='left')
+            last = np.searchsorted(self.words, word + '￿', side='left')
+            found = np.unique(self.word_ids[first:last])
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        return ids
+
+    def complete(self, text, limit=DEFAULT_LIMIT):
+        """Up to ``limit`` ingredient names matching ``text``, most used first (the most used overall when empty)."""
+        ids = self.matching_ids(text)
+        if ids is None:
+            ranked = self.popular[:limit]
+        else:
+            ranked = ids[np.lexsort((ids, -self.frequencies[ids]))][:limit]
+        return [self.vocabulary[i] for i in ranked]
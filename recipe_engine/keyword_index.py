@@ -0,0 +1,190 @@
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+from .ingredient_normalizer import singularize
+from .recipe_index import EMPTY_ROWS
+
+# -------------------------------------------------
+# Keyword Full-Text Index
+# -------------------------------------------------
+# Built once with the artifact from recipe titles and the parsed direction steps:
+# term -> ascending recipe rows plus term frequencies, and each recipe's length
+# in terms. A keyword query looks up the posting list of each of its terms
+# (every term must occur), intersects them rarest first and scores the result
+# with BM25. Queries never touch the recipe strings. Terms are lowercase words,
+# singularized like ingredient names, minus a few stop words; title words count
+# TITLE_WEIGHT times.
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'if', 'in', 'into', 'is', 'it', 'of', 'on',
+    'or', 'the', 'then', 'to', 'until', 'with',
+})
+TITLE_WEIGHT = 2
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Recipes tokenized per batch while building (bounds the temporary token lists)
+BUILD_CHUNK_ROWS = 20_000
+
+
+def keyword_terms(text):
+    """Index terms of a title, a step or a keyword query, in order (duplicates kept)."""
+    return [singularize(word) for word in TOKEN_PATTERN.findall(str(text).lower()) if word not in STOP_WORDS]
+
+
+def contains_sorted(values, sorted_values):
+    """Mask of the ``values`` present in an ascending array (binary search, no hashing or full scan)."""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    position = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[position] == values
+
+
+def intersect_sorted(left, right):
+    """Values present in both ascending unique arrays, probing the longer one with the shorter."""
+    if len(left) > len(right):
+        left, right = right, left
+    return left[contains_sorted(left, right)]
+
+
+class KeywordIndex:
+    """Term posting lists with frequencies over recipe titles and directions, ranked with BM25."""
+
+    ARRAYS = ('keyword_offsets', 'keyword_postings', 'keyword_frequencies', 'keyword_lengths')
+
+    def __init__(self, terms, offsets, postings, frequencies, lengths):
+        self.terms = terms
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.postings = postings
+        self.frequencies = frequencies
+        # Terms per recipe (title terms counted TITLE_WEIGHT times), the BM25 document length
+        self.lengths = lengths
+        self.num_recipes = len(lengths)
+        self.average_length = float(lengths.mean()) if len(lengths) and lengths.any() else 1.0
+
+        for values in self.arrays().values():
+            values.setflags(write=False)
+
+    @classmethod
+    def build(cls, titles, text, chunk_rows=BUILD_CHUNK_ROWS):
+        """Tokenizes every title and direction step (``text`` is the dataset's RecipeText)."""
+        titles = list(titles)
+        num_recipes = len(titles)
+        terms, term_ids, keys, counts = [], {}, [], []
+        for start in range(0, num_recipes, chunk_rows):
+            words, lengths = [], []
+            for row in range(start, min(start + chunk_rows, num_recipes)):
+                recipe_words = TOKEN_PATTERN.findall(str(titles[row]).lower()) * TITLE_WEIGHT
+                for step in text.steps(row):
+                    recipe_words.extend(TOKEN_PATTERN.findall(step.lower()))
+                words.extend(recipe_words)
+                lengths.append(len(recipe_words))
+            rows = np.repeat(np.arange(start, start + len(lengths), dtype=np.int64), lengths)
+
+            # Stemming and stop words once per distinct word of the chunk, not per occurrence
+            codes, uniques = pd.factorize(pd.Series(words, dtype=object))
+            local_to_term = np.full(len(uniques) + 1, -1, dtype=np.int64)
+            for i, word in enumerate(uniques.tolist()):
+                if word not in STOP_WORDS:
+                    term = singularize(word)
+                    if term not in term_ids:
+                        term_ids[term] = len(terms)
+                        terms.append(term)
+                    local_to_term[i] = term_ids[term]
+            term_codes = local_to_term[codes]
+            keep = term_codes >= 0
+            chunk_keys, chunk_counts = np.unique(term_codes[keep] * num_recipes + rows[keep], return_counts=True)
+            keys.append(chunk_keys)
+            counts.append(chunk_counts)
+
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+        counts = np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+        num_keys = max(num_recipes, 1)
+        return cls._from_pairs(terms, keys // num_keys, keys % num_keys, counts, num_recipes)
+
+    @classmethod
+    def concat(cls, parts):
+        """Joins indexes of consecutive row ranges (the shards of build_index) into one, as if built at once.
+
+        Each term's posting list is its parts' slices back to back (later parts hold later rows),
+        so the slices are copied straight into place without re-sorting.
+        """
+        terms = sorted(set().union(*(part.terms for part in parts)))
+        term_ids = {term: i for i, term in enumerate(terms)}
+        local_to_term = [np.array([term_ids[term] for term in part.terms], dtype=np.int64) for part in parts]
+        term_counts = np.zeros(len(terms), dtype=np.int64)
+        for part, mapping in zip(parts, local_to_term):
+            term_counts[mapping] += np.diff(part.offsets)
+        offsets = np.concatenate(([0], np.cumsum(term_counts))).astype(np.int64)
+
+        postings = np.empty(offsets[-1], dtype=np.int32)
+        frequencies = np.empty(offsets[-1], dtype=np.int32)
+        filled = offsets[:-1].copy()
+        row_start = 0
+        for part, mapping in zip(parts, local_to_term):
+            counts = np.diff(part.offsets)
+            destination = np.repeat(filled[mapping] - part.offsets[:-1], counts) + np.arange(len(part.postings))
+            postings[destination] = part.postings + row_start
+            frequencies[destination] = part.frequencies
+            filled[mapping] += counts
+            row_start += part.num_recipes
+        lengths = np.concatenate([part.lengths for part in parts]) if parts else np.empty(0, dtype=np.int32)
+        return cls(terms, offsets, postings, frequencies, lengths.astype(np.int32))
+
+    @classmethod
+    def _from_pairs(cls, terms, term_codes, rows, counts, num_recipes):
+        """Index from (term code, row, frequency) triples, each pair once; terms sorted for reproducible builds."""
+        order = sorted(range(len(terms)), key=terms.__getitem__)
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[order] = np.arange(len(terms))
+        term_codes = rank[term_codes]
+        by_term = np.argsort(term_codes * num_recipes + rows, kind='stable')
+        return cls(
+            [terms[i] for i in order],
+            np.concatenate(([0], np.cumsum(np.bincount(term_codes, minlength=len(terms))))).astype(np.int64),
+            rows[by_term].astype(np.int32),
+            counts[by_term].astype(np.int32),
+            np.bincount(rows, weights=counts, minlength=num_recipes).astype(np.int32),
+        )
+
+    def arrays(self):
+        return {
+            'keyword_offsets': self.offsets, 'keyword_postings': self.postings,
+            'keyword_frequencies': self.frequencies, 'keyword_lengths': self.lengths,
+        }
+
+    def nbytes(self):
+        return int(sum(values.nbytes for values in self.arrays().values()))
+
+    def posting_list(self, term_id):
+        return self.postings[self.offsets[term_id]:self.offsets[term_id + 1]]
+
+    def search(self, query):
+        """(ascending rows, BM25 scores) of the recipes containing every query term; None when it has no terms."""
+        terms = set(keyword_terms(query))
+        if not terms:
+            return None
+        term_ids = [self.term_ids.get(term) for term in terms]
+        if None in term_ids:
+            return EMPTY_ROWS, np.empty(0)
+
+        term_ids.sort(key=lambda term_id: self.offsets[term_id + 1] - self.offsets[term_id])
+        rows = self.posting_list(term_ids[0])
+        for term_id in term_ids[1:]:
+            rows = intersect_sorted(rows, self.posting_list(term_id))
+
+        scores = np.zeros(len(rows))
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[rows] / self.average_length)
+        for term_id in term_ids:
+            postings = self.posting_list(term_id)
+            frequency = self.frequencies[self.offsets[term_id] + np.searchsorted(postings, rows)]
+            idf = math.log(1 + (self.num_recipes - len(postings) + 0.5) / (len(postings) + 0.5))
+            scores += idf * frequency * (BM25_K1 + 1) / (frequency + length_norm)
+        return rows, scores
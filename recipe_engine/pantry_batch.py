@@ -0,0 +1,206 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from .recipe_index import ALL_CATEGORIES
+from .recipe_ranking import DEFAULT_WEIGHTS, rank_top_k, simplicity
+
+# -------------------------------------------------
+# Batch Pantry Scoring
+# -------------------------------------------------
+# "What can I cook" for many pantries at once. Pantries become rows of a sparse
+# pantry x ingredient matrix; one sparse product with the ingredient x recipe
+# matrix (the posting lists, viewed as CSR without copying them) yields the
+# matched count of every (pantry, recipe) pair that shares an ingredient. The
+# threshold and category filters, the ranking score of recipe_ranking and the
+# per-pantry top K are then computed over all pairs of a block at once. At high
+# thresholds only the pantry's rarest ingredients can produce a match, so the
+# product then runs over those alone (see matched_pairs).
+# Pantries are processed in blocks to bound the size of the product, and blocks
+# can be spread over worker processes. Per pantry the results equal
+# IngredientIndex.query (count) and rank_top_k (top K).
+
+# Pantries per sparse product; bounds memory to about block size x matches per pantry
+DEFAULT_BLOCK_PANTRIES = 256
+
+# counts[p]: recipes passing the filters for pantry p
+# top_ids[p], top_scores[p]: best K row positions and scores, padded with -1 / NaN
+PantryResults = namedtuple('PantryResults', ['counts', 'top_ids', 'top_scores'])
+
+_worker_state = None
+
+
+def pantry_matrix(index, pantries):
+    """(CSR pantry x ingredient matrix, distinct selected names per pantry), resolved like IngredientIndex.query."""
+    resolved = {}
+    indptr, indices, num_selected = [0], [], []
+    for pantry in pantries:
+        ids, unknown = set(), set()
+        for name in set(pantry):
+            if name not in resolved:
+                resolved[name] = index.resolve(name)
+            if resolved[name] is None:
+                unknown.add(name)
+            else:
+                ids.add(resolved[name])
+        indices.extend(sorted(ids))
+        indptr.append(len(indices))
+        num_selected.append(len(ids) + len(unknown))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(num_selected), len(index.vocabulary))
+    )
+    return matrix, np.array(num_selected, dtype=np.int64)
+
+
+def ingredient_matrix(index):
+    """Ingredient x recipe CSR matrix over the index's own posting arrays."""
+    return sparse.csr_matrix(
+        (np.ones(len(index.postings), dtype=np.int32), index.postings, index.offsets),
+        shape=(len(index.vocabulary), index.num_recipes)
+    )
+
+
+def matched_pairs(index, ingredients, pantries, num_selected, threshold_percent):
+    """(pantry rows, recipe rows, matched counts) of the pairs that can reach the threshold, plus possibly others.
+
+    A recipe reaching the threshold contains at least one of the pantry's (size - needed + 1) rarest
+    ingredients. When the posting lists of those are much shorter than the pantry's full postings,
+    candidates come from them only and each candidate's full count is read off the recipe's own
+    ingredient list; otherwise one product with every pantry ingredient gives all counts directly.
+    """
+    num_pantries = pantries.shape[0]
+    frequencies = np.diff(index.offsets)
+    sizes = np.diff(pantries.indptr)
+    pantry_rows = np.repeat(np.arange(num_pantries), sizes)
+    needed = (threshold_percent * num_selected + 99) // 100
+
+    # Rarest ingredients first within each pantry
+    order = np.lexsort((pantries.indices, frequencies[pantries.indices], pantry_rows))
+    ids = pantries.indices[order]
+    ranks = np.arange(len(ids)) - pantries.indptr[pantry_rows]
+    prefix = ranks < (sizes - needed + 1)[pantry_rows]
+    recipe_size = index.matrix.nnz / max(index.num_recipes, 1)
+    if frequencies[ids[prefix]].sum() * (1 + recipe_size) >= frequencies[ids].sum():
+        product = (pantries @ ingredients).tocsr()
+        return np.repeat(np.arange(num_pantries), np.diff(product.indptr)), product.indices, product.data
+
+    rare = sparse.csr_matrix(
+        (np.ones(np.count_nonzero(prefix), dtype=np.int32), ids[prefix],
+         np.concatenate(([0], np.cumsum(np.bincount(pantry_rows[prefix], minlength=num_pantries))))),
+        shape=pantries.shape
+    )
+    candidates = (rare @ ingredients).tocsr()
+    rows = np.repeat(np.arange(num_pantries), np.diff(candidates.indptr))
+    recipes = candidates.indices
+
+    # Matched count = how many of the candidate recipe's ingredients are in the pantry
+    in_pantry = pantries.toarray().astype(bool)
+    lengths = np.diff(index.matrix.indptr)[recipes]
+    pair_of = np.repeat(np.arange(len(recipes)), lengths)
+    starts = index.matrix.indptr[recipes] - (np.cumsum(lengths) - lengths)
+    positions = np.arange(len(pair_of)) + np.repeat(starts, lengths)
+    hits = in_pantry[rows[pair_of], index.matrix.indices[positions]]
+    return rows, recipes, np.bincount(pair_of[hits], minlength=len(recipes))
+
+
+def _no_results(num_pantries, k):
+    return PantryResults(
+        np.zeros(num_pantries, dtype=np.int64), np.full((num_pantries, k), -1, dtype=np.int32),
+        np.full((num_pantries, k), np.nan),
+    )
+
+
+def score_block(index, ingredients, complexity_codes, num_levels, pantries, num_selected, threshold_percent,
+                selected_category, k, weights=DEFAULT_WEIGHTS):
+    """PantryResults for one block of pantries (rows of ``pantries``)."""
+    num_pantries = pantries.shape[0]
+    counts, top_ids, top_scores = _no_results(num_pantries, k)
+
+    rows, recipes, matched = matched_pairs(index, ingredients, pantries, num_selected, threshold_percent)
+    selected = num_selected[rows]
+
+    # Exact integer form of matched / selected >= threshold / 100 (the fractions are never within rounding)
+    keep = matched * 100 >= selected * threshold_percent
+    if threshold_percent == 100:
+        keep &= index.token_counts[recipes] == selected
+    if selected_category != ALL_CATEGORIES:
+        keep &= index.category_codes[recipes] == index.category_ids.get(selected_category, -2)
+    rows, recipes, matched, selected = rows[keep], recipes[keep], matched[keep], selected[keep]
+    counts += np.bincount(rows, minlength=num_pantries)
+
+    if k > 0 and len(rows):
+        # Same expression as rank_top_k, so scores (and ties) are identical
+        scores = (
+            weights.match * matched / selected
+            + weights.coverage * matched / index.token_counts[recipes]
+            + weights.simplicity * simplicity(complexity_codes, recipes, num_levels)
+        )
+        order = np.lexsort((recipes, -scores, rows))
+        rows, recipes, scores = rows[order], recipes[order], scores[order]
+        group_starts = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=num_pantries))[:-1]))
+        ranks = np.arange(len(rows)) - group_starts[rows]
+        best = ranks < k
+        top_ids[rows[best], ranks[best]] = recipes[best]
+        top_scores[rows[best], ranks[best]] = scores[best]
+
+    return PantryResults(counts, top_ids, top_scores)
+
+
+def _init_worker(index, complexity_codes, num_levels):
+    global _worker_state
+    _worker_state = (index, ingredient_matrix(index), complexity_codes, num_levels)
+
+
+def _score_block_in_worker(pantries, num_selected, threshold_percent, selected_category, k, weights):
+    index, ingredients, complexity_codes, num_levels = _worker_state
+    return score_block(index, ingredients, complexity_codes, num_levels, pantries, num_selected,
+                       threshold_percent, selected_category, k, weights)
+
+
+def score_pantries(index, complexity_codes, num_levels, pantries, threshold_percent, selected_category=ALL_CATEGORIES,
+                   k=10, weights=DEFAULT_WEIGHTS, workers=None, block_size=DEFAULT_BLOCK_PANTRIES):
+    """PantryResults for every pantry (a list of ingredient name lists), best recipes first.
+
+    ``workers`` > 1 spreads the blocks over that many processes; each receives the index once.
+    At a 0% threshold every recipe qualifies, so pantries are answered one by one instead.
+    """
+    pantries = list(pantries)
+    matrix, num_selected = pantry_matrix(index, pantries)
+    blocks = [
+        (matrix[start:start + block_size], num_selected[start:start + block_size])
+        for start in range(0, len(num_selected), block_size)
+    ]
+    if threshold_percent <= 0 or not blocks:
+        results = [_no_results(len(pantries), k)]
+    elif workers and workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(index, complexity_codes, num_levels)) as pool:
+            results = list(pool.map(
+                _score_block_in_worker, *zip(*blocks),
+                *([value] * len(blocks) for value in (threshold_percent, selected_category, k, weights))
+            ))
+    else:
+        ingredients = ingredient_matrix(index)
+        results = [
+            score_block(index, ingredients, complexity_codes, num_levels, block, block_selected, threshold_percent,
+                        selected_category, k, weights)
+            for block, block_selected in blocks
+        ]
+
+    counts, top_ids, top_scores = (np.concatenate(parts) for parts in zip(*results))
+
+    # Every recipe qualifies at 0%, and an empty pantry only filters by category: these
+    # depend on recipes sharing no ingredient with the pantry, so they take the single-query path.
+    special = range(len(pantries)) if threshold_percent <= 0 else np.flatnonzero(num_selected == 0).tolist()
+    for pantry in special:
+        counts[pantry] = len(index.query(pantries[pantry], threshold_percent, selected_category))
+        best_rows, best_scores = rank_top_k(
+            index, complexity_codes, num_levels, pantries[pantry], threshold_percent, selected_category, k, weights
+        )
+        top_ids[pantry, :len(best_rows)] = best_rows
+        top_scores[pantry, :len(best_rows)] = best_scores
+
+    return PantryResults(counts, top_ids, top_scores)
@@ -0,0 +1,156 @@
+import bisect
+import functools
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# -------------------------------------------------
+# Timing and Metrics
+# -------------------------------------------------
+# A process-wide registry of latency histograms, counters and gauges for the hot
+# paths (data load, filtering, rendering, exports). Recording is a lock and a few
+# additions, cheap enough to leave on in production. Gauges are callbacks read
+# only when a snapshot is taken (e.g. query cache hit rate). The Diagnostics page
+# renders snapshots, and the same data is available as JSON or in the
+# Prometheus text exposition format.
+
+# Upper bounds in seconds (the last bucket is +Inf)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Upper bounds in bytes, for size histograms such as session memory
+SIZE_BUCKETS = tuple(2 ** power for power in range(10, 31, 2))
+# Recent samples kept per histogram for percentiles
+RECENT_SAMPLES = 1024
+
+METRIC_PREFIX = 'chefs_compass_'
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count, plus recent samples for percentiles."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def percentile(self, share):
+        """Nearest-rank percentile of the recent samples (None when empty)."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(share * len(ordered)) - 1))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max_recent': max(self.recent) if self.recent else None,
+            'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], self.bucket_counts)),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe named histograms, counters and gauge callbacks."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def register_gauge(self, name, callback):
+        """``callback()`` returns the current value; it is evaluated at snapshot time."""
+        with self._lock:
+            self.gauges[name] = callback
+
+    @contextmanager
+    def timer(self, name):
+        """Records the duration of the ``with`` block (also when it raises) in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def timed(self, name):
+        """Decorator form of ``timer``."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """Plain dict of every metric, safe to serialize."""
+        with self._lock:
+            histograms = {name: histogram.summary() for name, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        gauge_values = {}
+        for name, callback in gauges.items():
+            try:
+                gauge_values[name] = float(callback())
+            except Exception:
+                gauge_values[name] = None
+        return {'histograms': histograms, 'counters': counters, 'gauges': gauge_values}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (histograms, counters and gauges)."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, summary in sorted(snapshot['histograms'].items()):
+            metric = METRIC_PREFIX + name
+            lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, count in summary['buckets'].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum {summary["sum"]}')
+            lines.append(f'{metric}_count {summary["count"]}')
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'# TYPE {METRIC_PREFIX}{name}_total counter')
+            lines.append(f'{METRIC_PREFIX}{name}_total {value}')
+        for name, value in sorted(snapshot['gauges'].items()):
+            if value is not None:
+                lines.append(f'# TYPE {METRIC_PREFIX}{name} gauge')
+                lines.append(f'{METRIC_PREFIX}{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by every module and session in the process
+metrics = MetricsRegistry()
@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+from .keyword_index import keyword_terms
+
+# -------------------------------------------------
+# Bounded Query Result Cache
+# -------------------------------------------------
+# filter_recipes results are keyed by the dataset version token plus the
+# normalized query, never by the DataFrame itself, so building a key costs
+# nothing no matter how large the catalog is. Values are read-only arrays of
+# row positions, which keeps the cache small and safe to share across sessions.
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def normalize_query(version, selected_ingredients, threshold_percent, selected_category, top_k=None, keywords=''):
+    """Hashable cache key: dataset version, sorted ingredients, category, threshold, top-K size, keyword terms."""
+    return (
+        version, tuple(sorted(selected_ingredients or ())), selected_category, int(threshold_percent),
+        int(top_k) if top_k else None, tuple(sorted(set(keyword_terms(keywords or '')))),
+    )
+
+
+class QueryCache:
+    """Thread-safe LRU with hit/miss counters, shared by every session in the process."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the cached value (marking it most recently used) or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """Stores a value, evicting the least recently used entries beyond max_entries."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def drop_version(self, version):
+        """Removes every entry computed against the given dataset version."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == version]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Current size and counters, e.g. for logging or a diagnostics view."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
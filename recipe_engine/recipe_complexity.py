@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Complexity Banding
+# -------------------------------------------------
+# Complexity is an ordered categorical stored as int8 codes and assigned in one
+# vectorized pass: a per-recipe measure is cut at its quantiles. Recipes are
+# stored in complexity order, so every result set is already sorted by it.
+
+# measure: which columns define "complexity" (see MEASURES)
+# quantiles: cut points; a value <= the first cut is band 0, and so on
+# labels: one per band, from least to most complex
+ComplexityBanding = namedtuple('ComplexityBanding', ['measure', 'quantiles', 'labels'])
+
+MEASURES = {
+    'steps': lambda df: df['num_steps'],
+    'ingredients': lambda df: df['num_ingredients'],
+    # The "Average Recipe Complexity" KPI from the About page
+    'ingredients_and_steps': lambda df: (df['num_ingredients'] + df['num_steps']) / 2,
+}
+
+# How each measure reads in a band description ("<= 4 steps")
+MEASURE_UNITS = {
+    'steps': 'steps',
+    'ingredients': 'ingredients',
+    'ingredients_and_steps': 'ingredients and steps on average',
+}
+
+# Simple (<= Q1 steps), Medium (<= Q3 steps), Complex (> Q3 steps)
+DEFAULT_BANDING = ComplexityBanding('steps', (0.25, 0.75), ('Simple', 'Medium', 'Complex'))
+
+
+def validate_banding(banding):
+    if banding.measure not in MEASURES:
+        raise ValueError(f"Unknown complexity measure {banding.measure!r}; expected one of {sorted(MEASURES)}")
+    if len(banding.labels) != len(banding.quantiles) + 1:
+        raise ValueError('Complexity banding needs exactly one more label than quantile cut points')
+    if list(banding.quantiles) != sorted(banding.quantiles):
+        raise ValueError('Complexity quantiles must be ascending')
+
+
+def band_edges(df, banding=DEFAULT_BANDING):
+    """Measure values at the banding's quantiles (the upper bound of every band but the last)."""
+    validate_banding(banding)
+    return MEASURES[banding.measure](df).quantile(list(banding.quantiles)).to_numpy(dtype=float)
+
+
+def describe_bands(banding, edges):
+    """One line per band, e.g. 'Simple (≤ 4 steps, the 25th percentile)'."""
+    unit = MEASURE_UNITS[banding.measure]
+    descriptions = []
+    for band, label in enumerate(banding.labels):
+        if band < len(edges):
+            rule = f'≤ {edges[band]:g} {unit}, the {banding.quantiles[band] * 100:g}th percentile'
+        else:
+            rule = f'> {edges[-1]:g} {unit}' if len(edges) else f'any number of {unit}'
+        descriptions.append(f'{label} ({rule})')
+    return descriptions
+
+
+def complexity_codes(df, banding=DEFAULT_BANDING):
+    """Vectorized band assignment. Returns int8 codes into ``banding.labels``."""
+    edges = band_edges(df, banding)
+    measure = MEASURES[banding.measure](df)
+    # Number of cut points strictly below each value: <= q1 -> 0, <= q2 -> 1, ...
+    # (missing values sort past every cut point, i.e. into the most complex band)
+    return np.searchsorted(edges, measure.to_numpy(dtype=float), side='left').astype(np.int8)
+
+
+def complexity_column(codes, labels):
+    """Ordered Categorical for the Complexity column, built straight from the int8 codes."""
+    return pd.Categorical.from_codes(codes, categories=list(labels), ordered=True)
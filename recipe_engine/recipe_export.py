@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .perf_metrics import metrics
+
+# -------------------------------------------------
+# Chunked, Cached Exports
+# -------------------------------------------------
+# Downloads are generated only when a download button is clicked, a chunk of
+# rows at a time, straight into a file in the export cache. The file is keyed by
+# dataset version, query and format, so a repeated download (from any session)
+# is just a file read and peak memory never holds more than one chunk of encoded
+# rows next to the shared frame.
+
+# extension: file suffix, mime: Content-Type for the download button
+ExportFormat = namedtuple('ExportFormat', ['extension', 'mime'])
+
+EXPORT_FORMATS = {
+    'CSV': ExportFormat('csv', 'text/csv'),
+    'JSON Lines': ExportFormat('jsonl', 'application/x-ndjson'),
+    'Parquet': ExportFormat('parquet', 'application/vnd.apache.parquet'),
+}
+
+CHUNK_ROWS = 10_000
+# Export files kept per cache directory; the least recently used are removed
+MAX_EXPORT_FILES = 16
+
+# One lock per export file, so only requests for the same export wait on its write;
+# _lock only guards the table (and the shared eviction pass)
+_lock = threading.Lock()
+_path_locks = {}
+
+
+def export_key(version, query, export_format):
+    """File name for an export: dataset version, a short hash of the query, and the format suffix."""
+    query_id = hashlib.sha256(repr(query).encode('utf-8')).hexdigest()[:16]
+    return f'{version}-{query_id}.{EXPORT_FORMATS[export_format].extension}'
+
+
+def _chunks(df, row_ids, chunk_rows):
+    total = len(df) if row_ids is None else len(row_ids)
+    for start in range(0, total, chunk_rows):
+        if row_ids is None:
+            yield df.iloc[start:start + chunk_rows]
+        else:
+            yield df.iloc[row_ids[start:start + chunk_rows]]
+
+
+def write_export(handle, df, row_ids, export_format, chunk_rows=CHUNK_ROWS):
+    """Writes the rows (all of ``df`` when ``row_ids`` is None) to a binary file handle, chunk by chunk."""
+    if export_format == 'Parquet':
+        writer = None
+        for chunk in _chunks(df, row_ids, chunk_rows):
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(handle, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+        if writer is None:
+            writer = pq.ParquetWriter(handle, pa.Schema.from_pandas(df.iloc[:0], preserve_index=False))
+        writer.close()
+        return
+
+    header = True
+    for chunk in _chunks(df, row_ids, chunk_rows):
+        if export_format == 'CSV':
+            text = chunk.to_csv(index=False, header=header)
+        else:
+            text = chunk.to_json(orient='records', lines=True, force_ascii=False)
+            if text and not text.endswith('\n'):
+                text += '\n'
+        handle.write(text.encode('utf-8'))
+        header = False
+    if header and export_format == 'CSV':
+        handle.write(df.iloc[:0].to_csv(index=False).encode('utf-8'))
+
+
+@contextmanager
+def _locked(path):
+    """Holds the lock of one export file; the entry is dropped once no thread uses it."""
+    with _lock:
+        entry = _path_locks.setdefault(path, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _path_locks[path]
+
+
+def _evict(export_dir, keep):
+    files = [os.path.join(export_dir, name) for name in os.listdir(export_dir) if not name.endswith('.tmp')]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for path in files[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def export_file(export_dir, version, query, df, row_ids, export_format):
+    """Path of the cached export, writing it first when missing."""
+    path = os.path.join(export_dir, export_key(version, query, export_format))
+    with _locked(path):
+        if os.path.exists(path):
+            os.utime(path)
+            metrics.increment('export_cache_hits')
+            return path
+        metrics.increment('export_cache_misses')
+        os.makedirs(export_dir, exist_ok=True)
+        staging = f'{path}.{threading.get_ident()}.tmp'
+        with metrics.timer('export_write_seconds'), open(staging, 'wb') as handle:
+            write_export(handle, df, row_ids, export_format)
+        os.replace(staging, path)
+    with _lock:
+        _evict(export_dir, MAX_EXPORT_FILES)
+    return path
+
+
+def read_export(export_dir, version, query, df, row_ids, export_format):
+    """Contents of the cached export (for a download button's deferred ``data`` callable)."""
+    with open(export_file(export_dir, version, query, df, row_ids, export_format), 'rb') as handle:
+        return handle.read()
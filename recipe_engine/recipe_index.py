@@ -0,0 +1,272 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .ingredient_normalizer import TrigramIndex
+
+# -------------------------------------------------
+# Inverted Ingredient Index
+# -------------------------------------------------
+# Built once per dataset (next to load_data) so that filter_recipes never has to
+# re-split the raw ingredient strings. Every ingredient maps to a sorted array of
+# recipe row positions (its posting list); match scores are posting-list counts.
+# The same (recipe, ingredient) pairs also form a CSR matrix so broad queries can
+# be scored with one sparse mat-vec against a one-hot query vector.
+
+INGREDIENT_COLUMN = 'cleaned_ingredients_filtered'
+ALL_CATEGORIES = 'All Categories'
+
+# Row positions are int32 throughout: compact enough to keep per session.
+EMPTY_ROWS = np.empty(0, dtype=np.int32)
+
+# Above this share of the catalog, summing posting lists costs more than a mat-vec.
+MATVEC_POSTING_SHARE = 0.125
+
+# Guards the lazy trigram builds: indexes are shared by every session thread. Module level so
+# the index itself stays picklable (pantry_batch hands it to worker processes).
+_fuzzy_lock = threading.Lock()
+
+
+def split_ingredients(series):
+    """Splits the comma separated ingredient strings exactly the way the filters always have."""
+    return series.fillna('').astype(str).str.lower().str.split(', ')
+
+
+def tokenize(df):
+    """(row positions, raw tokens) of every non-empty ingredient token, in row order."""
+    if INGREDIENT_COLUMN not in df.columns:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=object)
+    exploded = split_ingredients(df[INGREDIENT_COLUMN]).reset_index(drop=True).explode()
+    rows = exploded.index.to_numpy(dtype=np.int64)
+    tokens = exploded.to_numpy(dtype=object)
+    keep = pd.notna(tokens) & (tokens != '')
+    return rows[keep], tokens[keep]
+
+
+def canonical_vocabulary(raw_vocabulary, raw_counts, normalizer=None):
+    """(vocabulary, int32 raw id -> canonical id); the identity without a normalizer."""
+    if normalizer is None:
+        return list(raw_vocabulary), np.arange(len(raw_vocabulary), dtype=np.int32)
+    return normalizer.build_mapping(raw_vocabulary, raw_counts)
+
+
+def canonical_postings(rows, raw_codes, raw_to_canonical, num_recipes, vocabulary_size):
+    """Returns (offsets, postings, token_counts) from (row, raw token id) pairs.
+
+    Postings are grouped by canonical id with ascending rows. ``token_counts`` counts a
+    recipe's tokens, duplicates included, except tokens that only became duplicates
+    through normalization, which count once.
+    """
+    width = max(num_recipes, 1)
+    codes = raw_to_canonical[raw_codes]
+
+    # One entry per (ingredient, recipe) pair, ordered by ingredient then row.
+    pairs = np.unique(codes.astype(np.int64) * width + rows)
+    postings = pairs % width
+    offsets = np.concatenate((
+        [0], np.cumsum(np.bincount(pairs // width, minlength=vocabulary_size))
+    ))
+
+    raw_pairs = np.unique(np.asarray(raw_codes, dtype=np.int64) * width + rows)
+    merged_by_normalization = (
+        np.bincount(raw_pairs % width, minlength=num_recipes)
+        - np.bincount(postings, minlength=num_recipes)
+    )
+    token_counts = np.bincount(rows, minlength=num_recipes) - merged_by_normalization
+    return offsets.astype(np.int64), postings.astype(np.int32), token_counts.astype(np.int32)
+
+
+class IngredientIndex:
+    """Posting lists from ingredient (and category) to sorted recipe row positions.
+
+    Ingredient ids refer to canonical names (see ingredient_normalizer); the raw tokens
+    seen in the data map onto them through ``raw_to_canonical``.
+    """
+
+    def __init__(self, vocabulary, offsets, postings, matrix, token_counts, categories, category_codes,
+                 raw_vocabulary=None, raw_to_canonical=None, normalizer=None):
+        self.vocabulary = vocabulary
+        self.ingredient_ids = {name: i for i, name in enumerate(vocabulary)}
+        self.offsets = offsets
+        self.postings = postings
+        # Binary recipe x ingredient matrix (CSR), one row per recipe.
+        self.matrix = matrix
+        # Number of non-empty ingredient tokens per recipe (duplicates included, but
+        # tokens that only became duplicates through normalization counted once),
+        # the value the strict 100% match compares against.
+        self.token_counts = token_counts
+        self.categories = categories
+        self.category_ids = {name: i for i, name in enumerate(categories)}
+        self.category_codes = category_codes
+        self.num_recipes = len(token_counts)
+
+        if raw_vocabulary is None:
+            raw_vocabulary, raw_to_canonical = vocabulary, np.arange(len(vocabulary), dtype=np.int32)
+        self.raw_vocabulary = raw_vocabulary
+        self.raw_to_canonical = raw_to_canonical
+        self.raw_ids = {name: i for i, name in enumerate(raw_vocabulary)}
+        self.normalizer = normalizer
+        # Trigram index for fuzzy resolution, built on the first unknown name (see resolve)
+        self._fuzzy = None
+
+        order = np.argsort(category_codes, kind='stable')
+        known = category_codes[order] >= 0
+        self.category_rows = order[known].astype(np.int32)
+        self.category_offsets = np.concatenate((
+            [0], np.cumsum(np.bincount(category_codes[known], minlength=len(categories)))
+        ))
+
+        # The index is shared by every session, so its arrays are frozen.
+        for values in self._arrays():
+            values.setflags(write=False)
+
+    @classmethod
+    def build(cls, df, normalizer=None):
+        """Builds the index from the recipe DataFrame (row positions follow df order).
+
+        With a ``normalizer`` every raw token is mapped to a canonical ingredient id;
+        without one the raw (lowercased) tokens are the vocabulary.
+        """
+        rows, tokens = tokenize(df)
+        raw_codes, raw_vocabulary = pd.factorize(tokens, sort=True)
+        raw_vocabulary = [str(name) for name in raw_vocabulary]
+        vocabulary, raw_to_canonical = canonical_vocabulary(
+            raw_vocabulary, np.bincount(raw_codes, minlength=len(raw_vocabulary)), normalizer
+        )
+        offsets, postings, token_counts = canonical_postings(
+            rows, raw_codes, raw_to_canonical, len(df), len(vocabulary)
+        )
+        return cls.from_postings(
+            df, vocabulary, offsets, postings, token_counts, raw_vocabulary, raw_to_canonical, normalizer
+        )
+
+    @classmethod
+    def from_postings(cls, df, vocabulary, offsets, postings, token_counts, raw_vocabulary, raw_to_canonical,
+                      normalizer=None):
+        """Assembles the index from finished posting lists (the CSR matrix is derived from them)."""
+        matrix = sparse.csc_matrix(
+            (np.ones(len(postings), dtype=np.int32), postings, offsets),
+            shape=(len(df), len(vocabulary)),
+        ).tocsr()
+        category_codes, categories = pd.factorize(df['category'], sort=True)
+
+        return cls(
+            list(vocabulary),
+            np.asarray(offsets, dtype=np.int64),
+            np.asarray(postings, dtype=np.int32),
+            matrix,
+            np.asarray(token_counts, dtype=np.int32),
+            [str(name) for name in categories],
+            category_codes.astype(np.int32),
+            raw_vocabulary,
+            raw_to_canonical,
+            normalizer,
+        )
+
+    def _arrays(self):
+        return (
+            self.offsets, self.postings, self.token_counts, self.category_codes,
+            self.category_rows, self.category_offsets, self.raw_to_canonical,
+            self.matrix.data, self.matrix.indices, self.matrix.indptr,
+        )
+
+    def nbytes(self):
+        """Total size of the index arrays."""
+        return int(sum(values.nbytes for values in self._arrays()))
+
+    def posting_list(self, ingredient_id):
+        """Sorted row positions of the recipes that use the given ingredient id."""
+        return self.postings[self.offsets[ingredient_id]:self.offsets[ingredient_id + 1]]
+
+    def rows_in_category(self, category):
+        """Sorted row positions of every recipe in a category ('All Categories' means every row)."""
+        if category == ALL_CATEGORIES:
+            return np.arange(self.num_recipes, dtype=np.int32)
+        code = self.category_ids.get(category)
+        if code is None:
+            return EMPTY_ROWS
+        return self.category_rows[self.category_offsets[code]:self.category_offsets[code + 1]]
+
+    def resolve(self, name):
+        """Canonical ingredient id for a name (canonical, raw, normalized or fuzzy match), or None."""
+        if name in self.ingredient_ids:
+            return self.ingredient_ids[name]
+        if name in self.raw_ids:
+            return int(self.raw_to_canonical[self.raw_ids[name]])
+        if self.normalizer is None:
+            return None
+        form = self.normalizer.canonical_form(name)
+        if form in self.ingredient_ids:
+            return self.ingredient_ids[form]
+        fuzzy = self._fuzzy
+        if fuzzy is None:
+            with _fuzzy_lock:
+                if self._fuzzy is None:
+                    self._fuzzy = TrigramIndex(self.vocabulary)
+                fuzzy = self._fuzzy
+        return self.normalizer.fuzzy_match(fuzzy, form)
+
+    def resolve_query(self, selected_ingredients):
+        """Returns (sorted canonical ids, number of distinct selected ingredients).
+
+        Names resolving to the same canonical ingredient count once; names that resolve
+        to nothing still count towards the total (they can never be matched).
+        """
+        ids, unknown = set(), set()
+        for name in set(selected_ingredients):
+            ingredient_id = self.resolve(name)
+            if ingredient_id is None:
+                unknown.add(name)
+            else:
+                ids.add(ingredient_id)
+        return sorted(ids), len(ids) + len(unknown)
+
+    def query_vector(self, ingredient_ids):
+        """One-hot vector over the vocabulary for the given ingredient ids."""
+        vector = np.zeros(len(self.vocabulary), dtype=np.int32)
+        vector[list(ingredient_ids)] = 1
+        return vector
+
+    def match_counts(self, ingredient_ids):
+        """Returns (candidate rows, matched ingredient counts) for the given ingredient ids.
+
+        Rare ingredients are counted from their posting lists; once the postings cover a
+        large share of the catalog a single CSR mat-vec is cheaper.
+        """
+        if not ingredient_ids:
+            return EMPTY_ROWS, EMPTY_ROWS
+
+        posting_total = sum(self.offsets[i + 1] - self.offsets[i] for i in ingredient_ids)
+        if posting_total < MATVEC_POSTING_SHARE * self.num_recipes:
+            return np.unique(np.concatenate([self.posting_list(i) for i in ingredient_ids]), return_counts=True)
+
+        counts = self.matrix @ self.query_vector(ingredient_ids)
+        candidates = np.flatnonzero(counts).astype(np.int32)
+        return candidates, counts[candidates]
+
+    def matching_candidates(self, selected_ingredients, threshold_percent, selected_category):
+        """(rows, matched counts, number selected) of recipes sharing a selected ingredient that pass every filter."""
+        ingredient_ids, num_selected = self.resolve_query(selected_ingredients)
+        candidates, counts = self.match_counts(ingredient_ids)
+        keep = counts / num_selected >= threshold_percent / 100.0
+
+        if threshold_percent == 100:
+            keep &= self.token_counts[candidates] == num_selected
+
+        if selected_category != ALL_CATEGORIES:
+            keep &= self.category_codes[candidates] == self.category_ids.get(selected_category, -2)
+
+        return candidates[keep], counts[keep], num_selected
+
+    def query(self, selected_ingredients, threshold_percent, selected_category):
+        """Row positions (ascending) of the recipes passing the category, ingredient and threshold filters."""
+        if not selected_ingredients and selected_category == ALL_CATEGORIES and threshold_percent > 0:
+            return EMPTY_ROWS
+
+        if not selected_ingredients or threshold_percent <= 0:
+            # Every recipe scores at least 0%, so only the category narrows the result.
+            return self.rows_in_category(selected_category)
+
+        return self.matching_candidates(selected_ingredients, threshold_percent, selected_category)[0]
@@ -0,0 +1,124 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .recipe_index import EMPTY_ROWS
+
+# -------------------------------------------------
+# Ranked Top-K Retrieval
+# -------------------------------------------------
+# score = match * (matched / selected)            share of the user's ingredients used
+#       + coverage * (matched / recipe ingredients) share of the recipe already in the pantry
+#       + simplicity * (1 - band / last band)     simpler recipes first
+#
+# Candidates are grouped once by matched count (a stable radix argsort of the
+# small counts) and visited in buckets, best bucket first. Every score in a bucket
+# is bounded by its match term plus the maximum coverage and simplicity terms, so
+# once K results beat the next bucket's bound the rest of the candidates are never
+# scored. Inside a bucket the K best are partitioned out in linear time and only
+# those survivors are sorted, so a single common ingredient (one huge bucket)
+# costs a few passes over the candidates rather than a full sort.
+
+RankingWeights = namedtuple('RankingWeights', ['match', 'coverage', 'simplicity'])
+
+DEFAULT_WEIGHTS = RankingWeights(match=0.6, coverage=0.3, simplicity=0.1)
+
+
+def simplicity(complexity_codes, rows, num_levels):
+    """1.0 for the simplest band down to 0.0 for the most complex one."""
+    if num_levels <= 1:
+        return np.ones(len(rows))
+    return 1.0 - complexity_codes[rows] / (num_levels - 1)
+
+
+def _best(rows, scores, k):
+    """Top k by score (descending), ties broken by row position (i.e. simpler first)."""
+    order = np.lexsort((rows, -scores))[:k]
+    return rows[order], scores[order]
+
+
+def _top(rows, scores, k):
+    """_best without sorting everything: partition at the k-th best score, sort the survivors.
+
+    ``rows`` must be ascending, so the ties kept at the cut are the lowest rows, as in a full sort.
+    """
+    if len(rows) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = scores > kth
+        ties = np.flatnonzero(scores == kth)[:k - np.count_nonzero(above)]
+        keep = np.concatenate((np.flatnonzero(above), ties))
+        rows, scores = rows[keep], scores[keep]
+    return _best(rows, scores, k)
+
+
+def _unmatched_rows(category_rows, matched_rows, k):
+    """First k rows of the category that share no selected ingredient (both inputs sorted)."""
+    picked = []
+    found = 0
+    chunk_size = max(2 * k, 256)
+    for start in range(0, len(category_rows), chunk_size):
+        chunk = category_rows[start:start + chunk_size]
+        if len(matched_rows):
+            position = np.minimum(np.searchsorted(matched_rows, chunk), len(matched_rows) - 1)
+            chunk = chunk[matched_rows[position] != chunk]
+        picked.append(chunk[:k - found])
+        found += len(picked[-1])
+        if found >= k:
+            break
+    return np.concatenate(picked) if picked else EMPTY_ROWS
+
+
+def rank_top_k(index, complexity_codes, num_levels, selected_ingredients, threshold_percent,
+               selected_category, k, weights=DEFAULT_WEIGHTS, matcher=None):
+    """Returns (row positions, scores) of the k best recipes passing the usual filters, best first.
+
+    ``matcher`` supplies the candidates (defaults to ``index``; e.g. a session's IncrementalQuery).
+    """
+    if k <= 0:
+        return EMPTY_ROWS, np.empty(0)
+
+    if not selected_ingredients:
+        # Without ingredients every score is just simplicity, i.e. the stored row order.
+        rows = index.query(selected_ingredients, threshold_percent, selected_category)[:k]
+        return rows, weights.simplicity * simplicity(complexity_codes, rows, num_levels)
+
+    rows, counts, num_selected = (matcher or index).matching_candidates(selected_ingredients, threshold_percent, selected_category)
+
+    best_rows, best_scores = EMPTY_ROWS, np.empty(0)
+    bucket_sizes = np.bincount(counts) if len(counts) else np.empty(0, dtype=np.int64)
+    if np.count_nonzero(bucket_sizes) > 1:
+        # Counts are at most the number of selected ingredients: 16-bit keys take numpy's radix sort.
+        keys = counts.astype(np.uint16) if len(bucket_sizes) <= np.iinfo(np.uint16).max else counts
+        by_count = np.argsort(keys, kind='stable')
+    else:
+        by_count = None
+    bucket_ends = np.cumsum(bucket_sizes)
+    for matched in range(len(bucket_sizes) - 1, 0, -1):
+        if not bucket_sizes[matched]:
+            continue
+        bound = weights.match * matched / num_selected + weights.coverage + weights.simplicity
+        if len(best_rows) == k and best_scores[-1] > bound:
+            break
+
+        # Stable grouping keeps each bucket's rows ascending
+        bucket = rows if by_count is None else rows[by_count[bucket_ends[matched - 1]:bucket_ends[matched]]]
+        scores = (
+            weights.match * matched / num_selected
+            + weights.coverage * matched / index.token_counts[bucket]
+            + weights.simplicity * simplicity(complexity_codes, bucket, num_levels)
+        )
+        bucket, scores = _top(bucket, scores, k)
+        best_rows, best_scores = _best(
+            np.concatenate((best_rows, bucket)), np.concatenate((best_scores, scores)), k
+        )
+
+    # At 0% every other recipe in the category also qualifies, scoring only on simplicity.
+    # Rows are stored simplest first, so the first unmatched rows are the best of them.
+    if threshold_percent <= 0 and (len(best_rows) < k or best_scores[-1] <= weights.simplicity):
+        unmatched = _unmatched_rows(index.rows_in_category(selected_category), rows, k)
+        scores = weights.simplicity * simplicity(complexity_codes, unmatched, num_levels)
+        best_rows, best_scores = _best(
+            np.concatenate((best_rows, unmatched)), np.concatenate((best_scores, scores)), k
+        )
+
+    return best_rows.astype(np.int32), best_scores
@@ -0,0 +1,228 @@
+import logging
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .dataset_cache import DEFAULT_OPTIONS, default_cache_dir, load_dataset
+from .ingredient_search import IngredientSearch
+from .perf_metrics import metrics
+from .recipe_export import read_export
+
+# -------------------------------------------------
+# Process-wide Recipe Store
+# -------------------------------------------------
+# One read-only copy of the prepared dataset and its index per server process,
+# shared by every browser session (Streamlit runs sessions as threads). Sessions
+# only keep their query parameters and the array of matching row positions.
+#
+# A background StoreWatcher polls the source CSV and the artifact. When either
+# changes, and has stayed the same for one more poll (a CSV being copied is not
+# built half-written), it loads the new version on its own thread and swaps the
+# registry entry in one assignment. A deleted artifact alone is not a change. Stores are immutable, so sessions holding the old
+# one keep working until they switch; reload listeners (e.g. the query cache)
+# are told about every swap.
+
+DEFAULT_DATA_PATH = 'data/deduplicated_recipes_with_complexity.csv'
+
+# Seconds between checks of the source CSV and artifact
+RELOAD_INTERVAL = 5.0
+
+logger = logging.getLogger(__name__)
+
+_stores = {}
+_current_key = None
+_lock = threading.Lock()
+_watchers = {}
+_reload_listeners = []
+
+
+class RecipeStore:
+    """Read-only view over a prepared RecipeDataset. Never mutate ``df`` or the index arrays."""
+
+    def __init__(self, dataset, export_dir):
+        self.df = dataset.df
+        self.all_ingredients = tuple(dataset.all_ingredients)
+        self.all_categories = tuple(dataset.all_categories)
+        self.index = dataset.index
+        self.text = dataset.text
+        # Title and directions full-text search (see keyword_index)
+        self.keywords = dataset.keywords
+        # Precomputed summary for the Overview page (see dataset_stats)
+        self.stats = dataset.stats
+        # Sidebar type-ahead; the full vocabulary never goes to the browser
+        self.search = IngredientSearch.from_index(self.index)
+        self.complexity_labels = tuple(self.df['Complexity'].cat.categories)
+        self.complexity_codes = np.asarray(self.df['Complexity'].cat.codes)
+        self.complexity_codes.setflags(write=False)
+        self.version = dataset.version
+        # Title -> row id (first occurrence wins), for favorites and lookups by name
+        self.titles = self.df['recipe_title'].to_numpy()
+        self.title_ids = {}
+        for row_id, title in enumerate(self.titles.tolist()):
+            self.title_ids.setdefault(title, row_id)
+        # Cached download files (see recipe_export)
+        self.export_dir = export_dir
+        # Measured on first use (a deep memory_usage walks every string); see nbytes()
+        self._nbytes = None
+
+    def __len__(self):
+        return len(self.df)
+
+    def rows(self, row_ids):
+        """DataFrame slice for the given row positions (a transient copy, not to be kept in session state)."""
+        return self.df.iloc[row_ids]
+
+    def complexity_label(self, row_id):
+        return self.complexity_labels[self.complexity_codes[row_id]]
+
+    def export(self, export_format, row_ids=None, query=None):
+        """Encoded export of the given rows (every row when None), cached on disk by version and query."""
+        return read_export(self.export_dir, self.version, query, self.df, row_ids, export_format)
+
+    def nbytes(self):
+        """Approximate resident size of the shared frame and index (measured once; the store never changes)."""
+        if self._nbytes is None:
+            self._nbytes = (
+                int(self.df.memory_usage(deep=True).sum()) + self.index.nbytes() + self.text.nbytes()
+                + self.keywords.nbytes()
+            )
+        return self._nbytes
+
+
+def get_store(path=DEFAULT_DATA_PATH, options=DEFAULT_OPTIONS):
+    """Returns the shared store for ``path``, loading it once per process. Raises FileNotFoundError."""
+    global _current_key
+    key = (path, options)
+    with _lock:
+        if key not in _stores:
+            with metrics.timer('load_data_seconds'):
+                _stores[key] = RecipeStore(
+                    load_dataset(path, options=options), os.path.join(default_cache_dir(path), 'exports')
+                )
+        _current_key = key
+        return _stores[key]
+
+
+def add_reload_listener(callback):
+    """Registers ``callback(old_store, new_store)``, called after every swap."""
+    with _lock:
+        if callback not in _reload_listeners:
+            _reload_listeners.append(callback)
+
+
+@metrics.timed('store_reload_seconds')
+def reload_store(path=DEFAULT_DATA_PATH, options=DEFAULT_OPTIONS):
+    """Loads the current dataset version (building it if needed) and swaps it in when it is new.
+
+    Meant for the watcher thread: the load happens outside the lock, and requests keep
+    being served from the old store until the swap.
+    """
+    key = (path, options)
+    with metrics.timer('load_data_seconds'):
+        store = RecipeStore(
+            load_dataset(path, options=options), os.path.join(default_cache_dir(path), 'exports')
+        )
+    with _lock:
+        old = _stores.get(key)
+        if old is not None and old.version == store.version:
+            return old
+        _stores[key] = store
+        listeners = list(_reload_listeners)
+    if old is not None:
+        metrics.increment('store_swaps')
+        logger.info('Recipe store %s replaced by %s', old.version, store.version)
+        for callback in listeners:
+            callback(old, store)
+    return store
+
+
+def _source_signature(path, store):
+    """Size and mtime of the CSV and mtime of the store's artifact; a change triggers a reload."""
+    signature = []
+    for candidate in (path, os.path.join(default_cache_dir(path), store.version)):
+        try:
+            stat = os.stat(candidate)
+            signature.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class StoreWatcher(threading.Thread):
+    """Daemon thread that reloads a store when its CSV or artifact changes."""
+
+    def __init__(self, path, options, interval=RELOAD_INTERVAL):
+        super().__init__(name=f'store-watcher:{path}', daemon=True)
+        self.path = path
+        self.options = options
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        signature = _source_signature(self.path, get_store(self.path, self.options))
+        pending = None
+        while not self.stopped.wait(self.interval):
+            csv_signature, artifact_signature = _source_signature(self.path, _stores[(self.path, self.options)])
+            if artifact_signature is None:
+                # The artifact was removed (by hand or by another process); the loaded
+                # store keeps working, so only a CSV change warrants a rebuild
+                artifact_signature = signature[1]
+            current = (csv_signature, artifact_signature)
+            if current == signature:
+                pending = None
+                continue
+            if current != pending:
+                # Still changing (e.g. a CSV being copied): wait for it to settle
+                pending = current
+                continue
+            try:
+                store = reload_store(self.path, self.options)
+            except Exception:
+                # Keep serving the old version; a fixed file changes the signature again
+                logger.exception('Reloading %s failed', self.path)
+            else:
+                current = _source_signature(self.path, store)
+            signature = current
+            pending = None
+
+    def stop(self):
+        self.stopped.set()
+
+
+def watch_store(path=DEFAULT_DATA_PATH, options=DEFAULT_OPTIONS, interval=RELOAD_INTERVAL):
+    """Starts the watcher for a store once per process."""
+    key = (path, options)
+    with _lock:
+        if key in _watchers:
+            return _watchers[key]
+        watcher = _watchers[key] = StoreWatcher(path, options, interval)
+    watcher.start()
+    return watcher
+
+
+def current_store():
+    """The store most recently requested in this process (loading the default dataset if none yet)."""
+    return get_store(*(_current_key or (DEFAULT_DATA_PATH, DEFAULT_OPTIONS)))
+
+
+def estimate_nbytes(value):
+    """Rough deep size of a session state value: arrays and frames report their buffers."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def session_nbytes(session_state):
+    """Approximate memory held by one session's state."""
+    return sum(estimate_nbytes(session_state[key]) for key in list(session_state.keys()))
@@ -0,0 +1,141 @@
+import ast
+
+import numpy as np
+import pandas as pd
+
+from .recipe_index import INGREDIENT_COLUMN
+
+# -------------------------------------------------
+# Pre-parsed Recipe Text
+# -------------------------------------------------
+# Directions are stored in the CSV as Python list literals and used to be parsed
+# with ast.literal_eval on every rerun. They are now parsed once at build time into
+# flat UTF-8 buffers with offsets (memory-mappable, no Python object per step).
+# Rendering a recipe only slices its steps. Ingredient display lists are
+# precomputed the same way.
+
+DIRECTIONS_COLUMN = 'directions'
+
+
+def pack_strings(strings):
+    """Packs strings into (uint8 UTF-8 buffer, int64 byte offsets of length len(strings) + 1)."""
+    encoded = [text.encode('utf-8') for text in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(item) for item in encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def parse_directions(value):
+    """Returns (steps, parsed). Unparseable or non-list values fall back to the raw text as one block."""
+    if pd.isna(value):
+        return [''], False
+    try:
+        steps = ast.literal_eval(value)
+        if isinstance(steps, list):
+            return [step.strip() for step in steps], True
+    except (ValueError, SyntaxError, TypeError, AttributeError, MemoryError, RecursionError):
+        pass
+    return [str(value)], False
+
+
+def split_display_ingredients(value):
+    """Ingredient names as shown in the recipe details (capitalized, blanks dropped)."""
+    if pd.isna(value):
+        return []
+    return [ing.strip().capitalize() for ing in str(value).split(',') if ing.strip()]
+
+
+class RecipeText:
+    """Flat step and ingredient strings per recipe; row i owns items offsets[i]:offsets[i + 1]."""
+
+    ARRAYS = (
+        'step_blob', 'step_bounds', 'step_offsets', 'directions_parsed',
+        'ingredient_blob', 'ingredient_bounds', 'ingredient_offsets',
+    )
+
+    def __init__(self, step_blob, step_bounds, step_offsets, directions_parsed,
+                 ingredient_blob, ingredient_bounds, ingredient_offsets):
+        self.step_blob = step_blob
+        self.step_bounds = step_bounds
+        self.step_offsets = step_offsets
+        # False where the directions could not be parsed as a list; shown as raw text
+        self.directions_parsed = directions_parsed
+        self.ingredient_blob = ingredient_blob
+        self.ingredient_bounds = ingredient_bounds
+        self.ingredient_offsets = ingredient_offsets
+        self.unparsed_count = int(len(directions_parsed) - np.count_nonzero(directions_parsed))
+
+        for values in self.arrays().values():
+            values.setflags(write=False)
+
+    @classmethod
+    def build(cls, df):
+        """Parses every recipe's directions and ingredient list once."""
+        steps, step_counts, parsed = [], [], []
+        for value in df[DIRECTIONS_COLUMN].tolist():
+            recipe_steps, ok = parse_directions(value)
+            steps.extend(recipe_steps)
+            step_counts.append(len(recipe_steps))
+            parsed.append(ok)
+
+        ingredients, ingredient_counts = [], []
+        for value in df[INGREDIENT_COLUMN].tolist():
+            names = split_display_ingredients(value)
+            ingredients.extend(names)
+            ingredient_counts.append(len(names))
+
+        step_blob, step_bounds = pack_strings(steps)
+        ingredient_blob, ingredient_bounds = pack_strings(ingredients)
+        return cls(
+            step_blob, step_bounds, _offsets(step_counts), np.array(parsed, dtype=bool),
+            ingredient_blob, ingredient_bounds, _offsets(ingredient_counts),
+        )
+
+    @classmethod
+    def concat(cls, parts):
+        """Joins RecipeText built from consecutive row ranges (e.g. build shards), in order."""
+        def joined(blob_name, bounds_name, offsets_name):
+            blob = np.concatenate([getattr(part, blob_name) for part in parts])
+            bounds, offsets = [np.zeros(1, dtype=np.int64)], [np.zeros(1, dtype=np.int64)]
+            for part in parts:
+                bounds.append(getattr(part, bounds_name)[1:] + bounds[-1][-1])
+                offsets.append(getattr(part, offsets_name)[1:] + offsets[-1][-1])
+            return blob, np.concatenate(bounds), np.concatenate(offsets)
+
+        step_blob, step_bounds, step_offsets = joined('step_blob', 'step_bounds', 'step_offsets')
+        ingredient_blob, ingredient_bounds, ingredient_offsets = joined(
+            'ingredient_blob', 'ingredient_bounds', 'ingredient_offsets'
+        )
+        return cls(
+            step_blob, step_bounds, step_offsets,
+            np.concatenate([part.directions_parsed for part in parts]),
+            ingredient_blob, ingredient_bounds, ingredient_offsets,
+        )
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def nbytes(self):
+        return int(sum(values.nbytes for values in self.arrays().values()))
+
+    def steps(self, row_id):
+        """Direction steps for a recipe (a single raw-text entry when it failed to parse)."""
+        return _slice_strings(self.step_blob, self.step_bounds, self.step_offsets, row_id)
+
+    def ingredients(self, row_id):
+        """Display ingredient names for a recipe."""
+        return _slice_strings(self.ingredient_blob, self.ingredient_bounds, self.ingredient_offsets, row_id)
+
+
+def _offsets(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(np.asarray(counts, dtype=np.int64), out=offsets[1:])
+    return offsets
+
+
+def _slice_strings(blob, bounds, offsets, row_id):
+    first, last = offsets[row_id], offsets[row_id + 1]
+    return [
+        bytes(blob[bounds[i]:bounds[i + 1]]).decode('utf-8')
+        for i in range(first, last)
+    ]
@@ -0,0 +1,100 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from recipe_engine import ALL_CATEGORIES, DEFAULT_DATA_PATH, DEFAULT_OPTIONS, RecipeEngine
+from recipe_engine.pantry_batch import DEFAULT_BLOCK_PANTRIES
+from recipe_engine.recipe_ranking import rank_top_k
+
+# -------------------------------------------------
+# Batch "What Can I Cook"
+# -------------------------------------------------
+# Scores many pantries against the catalog with recipe_engine.pantry_batch and
+# writes one JSON line per pantry (matching recipe count, best recipe ids and
+# titles). Throughput is reported in pantries per second; --compare also times
+# the one-query-per-pantry path on the same input.
+#
+#   python score_pantries.py --pantries pantries.jsonl --threshold 50 --top-k 10 --workers 4
+#   python score_pantries.py --random 10000 --compare --output /dev/null
+#
+# Input lines are JSON lists of ingredient names, or objects with an "ingredients" list.
+
+
+def read_pantries(path):
+    pantries = []
+    with open(path) as handle:
+        for line in handle:
+            if line.strip():
+                pantry = json.loads(line)
+                pantries.append(pantry['ingredients'] if isinstance(pantry, dict) else pantry)
+    return pantries
+
+
+def random_pantries(index, count, seed=0, min_size=3, max_size=12):
+    """Pantries of popular ingredients (drawn by recipe frequency), like real kitchens."""
+    rng = np.random.default_rng(seed)
+    frequencies = np.diff(np.asarray(index.offsets)).astype(float)
+    weights = frequencies / frequencies.sum()
+    sizes = rng.integers(min_size, max_size + 1, size=count)
+    return [
+        [index.vocabulary[i] for i in rng.choice(len(weights), size=size, replace=False, p=weights)]
+        for size in sizes.tolist()
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Count and rank the recipes every pantry can make.')
+    parser.add_argument('csv_path', nargs='?', default=DEFAULT_DATA_PATH)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--pantries', help='JSON Lines file of pantries')
+    source.add_argument('--random', type=int, help='generate this many pantries instead')
+    parser.add_argument('--threshold', type=int, default=50, help='match threshold in percent')
+    parser.add_argument('--category', default=ALL_CATEGORIES)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: in this process)')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_PANTRIES, help='pantries per sparse product')
+    parser.add_argument('--output', default=None, help='JSON Lines results (default: stdout)')
+    parser.add_argument('--compare', action='store_true', help='also time one query per pantry')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    engine = RecipeEngine(args.csv_path, DEFAULT_OPTIONS, watch=False)
+    store = engine.store()
+    pantries = read_pantries(args.pantries) if args.pantries else random_pantries(store.index, args.random, args.seed)
+
+    started = time.perf_counter()
+    results = engine.score_pantries(
+        pantries, args.threshold, args.category, args.top_k, workers=args.workers, block_size=args.block_size,
+        store=store
+    )
+    elapsed = time.perf_counter() - started
+    print(f'{len(pantries):,} pantries in {elapsed:.2f}s ({len(pantries) / elapsed:,.0f} pantries/s)', file=sys.stderr)
+
+    if args.compare:
+        started = time.perf_counter()
+        for pantry in pantries:
+            store.index.query(pantry, args.threshold, args.category)
+            rank_top_k(store.index, store.complexity_codes, len(store.complexity_labels), pantry, args.threshold,
+                       args.category, args.top_k)
+        single = time.perf_counter() - started
+        print(f'one query per pantry: {single:.2f}s ({len(pantries) / single:,.0f} pantries/s, '
+              f'batch is {single / elapsed:.1f}x faster)', file=sys.stderr)
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for pantry, (count, top_ids) in enumerate(zip(results.counts.tolist(), results.top_ids)):
+            top_ids = top_ids[top_ids >= 0]
+            output.write(json.dumps({
+                'pantry': pantry, 'count': count, 'top_ids': top_ids.tolist(),
+                'top_titles': store.titles[top_ids].tolist(),
+            }) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from recipe_engine import ALL_CATEGORIES, DEFAULT_DATA_PATH, DEFAULT_OPTIONS, RecipeEngine, metrics
+
+# -------------------------------------------------
+# HTTP/JSON Query API
+# -------------------------------------------------
+# The ingredient matcher for other frontends and batch jobs, without a Streamlit
+# session (websocket + script thread) per client. One asyncio event loop owns
+# the sockets (HTTP/1.1 with keep-alive, standard library only); every request
+# is answered by a thread pool over the same in-memory RecipeEngine, so the
+# index, the shared store and the query result cache are those of one process.
+# Filtering has the Recipe Explorer's semantics (engine.filter).
+#
+#   GET  /recipes?ingredients=tomato,garlic&threshold=50&category=Soups
+#                &keywords=roasted+soup&top_k=50&page=2&page_size=20&fields=id,recipe_title,complexity
+#   POST /recipes          the same parameters as a JSON object (ingredients as a list)
+#   GET  /ingredients?q=tom&limit=20    type-ahead over the ingredient vocabulary
+#   GET  /categories
+#   GET  /health
+#   GET  /metrics          Prometheus text (see perf_metrics)
+#
+#   python serve_api.py --port 8765 --workers 4
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+DEFAULT_THRESHOLD = 50
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+MAX_TOP_K = 500
+MAX_SUGGESTIONS = 100
+# Largest accepted request body (POST /recipes)
+MAX_BODY_BYTES = 1 << 20
+
+# Projectable fields of a recipe; ``id`` is the row position in the store version of the response
+FIELDS = (
+    'id', 'recipe_title', 'category', 'subcategory', 'description', 'complexity', 'num_ingredients', 'num_steps',
+    'ingredients', 'directions',
+)
+DEFAULT_FIELDS = ('id', 'recipe_title', 'category', 'complexity')
+FRAME_FIELDS = {'recipe_title', 'category', 'subcategory', 'description', 'num_ingredients', 'num_steps'}
+
+STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    """Rejected request; answered with ``status`` and a JSON error message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_param(params, name, default, minimum, maximum):
+    value = params.get(name, default)
+    if value is None or value == '':
+        return default
+    # int() would truncate JSON floats (50.9 -> 50) and accept booleans
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ApiError(400, f'{name} must be an integer')
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f'{name} must be an integer') from None
+    if not minimum <= value <= maximum:
+        raise ApiError(400, f'{name} must be between {minimum} and {maximum}')
+    return value
+
+
+def _content_length(headers):
+    """Body size from the Content-Length header (0 when absent); only plain non-negative integers are accepted."""
+    value = headers.get('content-length', '')
+    if not value:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise ApiError(400, 'invalid Content-Length')
+    length = int(value)
+    if length > MAX_BODY_BYTES:
+        raise ApiError(413, 'request body too large')
+    return length
+
+
+def _list_param(value):
+    """A list from JSON, or comma-separated and/or repeated query values."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        raise ApiError(400, 'expected a list of strings')
+    return [part.strip() for item in value for part in str(item).split(',') if part.strip()]
+
+
+def query_params(query_string):
+    """Query string to a dict; repeated keys become lists."""
+    params = {}
+    for name, values in parse_qs(query_string, keep_blank_values=True).items():
+        params[name] = values if len(values) > 1 else values[0]
+    return params
+
+
+class RecipeApi:
+    """Request routing and JSON payloads over a RecipeEngine. Every method here runs on a pool thread."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def handle(self, method, target, body=b''):
+        """Returns (status, content type, body bytes) for one request."""
+        url = urlsplit(target)
+        try:
+            if url.path == '/recipes':
+                if method == 'GET':
+                    params = query_params(url.query)
+                elif method == 'POST':
+                    try:
+                        params = json.loads(body or b'{}')
+                    except ValueError:
+                        raise ApiError(400, 'body must be a JSON object') from None
+                    if not isinstance(params, dict):
+                        raise ApiError(400, 'body must be a JSON object')
+                else:
+                    raise ApiError(405, 'use GET or POST')
+                return self._json(200, self.recipes(params))
+            if method != 'GET':
+                raise ApiError(405 if url.path in ('/ingredients', '/categories', '/health', '/metrics') else 404,
+                               'use GET')
+            if url.path == '/ingredients':
+                return self._json(200, self.ingredients(query_params(url.query)))
+            if url.path == '/categories':
+                return self._json(200, {'categories': [ALL_CATEGORIES, *self.engine.store().all_categories]})
+            if url.path == '/health':
+                store = self.engine.store()
+                return self._json(200, {'status': 'ok', 'version': store.version, 'recipes': len(store)})
+            if url.path == '/metrics':
+                return 200, 'text/plain; version=0.0.4', metrics.to_prometheus().encode()
+            raise ApiError(404, f'no such endpoint: {url.path}')
+        except ApiError as error:
+            metrics.increment('api_client_errors')
+            return self._json(error.status, {'error': str(error)})
+        except Exception:
+            metrics.increment('api_server_errors')
+            logger.exception('%s %s failed', method, target)
+            return self._json(500, {'error': 'internal error'})
+
+    @staticmethod
+    def _json(status, payload):
+        return status, 'application/json', json.dumps(payload, separators=(',', ':')).encode()
+
+    def recipes(self, params):
+        """One page of filter results, projected onto the requested fields."""
+        ingredients = _list_param(params.get('ingredients', params.get('ingredient')))
+        threshold = _int_param(params, 'threshold', DEFAULT_THRESHOLD, 0, 100)
+        category = params.get('category') or ALL_CATEGORIES
+        if not isinstance(category, str):
+            raise ApiError(400, 'category must be a string')
+        keywords = params.get('keywords') or ''
+        if not isinstance(keywords, str):
+            raise ApiError(400, 'keywords must be a string')
+        top_k = _int_param(params, 'top_k', None, 1, MAX_TOP_K)
+        page = _int_param(params, 'page', 1, 1, 1 << 31)
+        page_size = _int_param(params, 'page_size', DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        fields = _list_param(params.get('fields')) or list(DEFAULT_FIELDS)
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown:
+            raise ApiError(400, f'unknown fields {unknown}; available: {list(FIELDS)}')
+
+        store = self.engine.store()
+        row_ids = self.engine.filter(ingredients, threshold, category, top_k, store=store, keywords=keywords)
+        start = (page - 1) * page_size
+        page_rows = row_ids[start:start + page_size]
+        return {
+            'version': store.version,
+            'total': len(row_ids),
+            'page': page,
+            'page_size': page_size,
+            'pages': max(1, -(-len(row_ids) // page_size)),
+            'ranked': top_k is not None,
+            'results': self.project(store, page_rows, fields),
+        }
+
+    @staticmethod
+    def project(store, row_ids, fields):
+        """Rows as dicts with only ``fields``; whole columns are sliced at once, not row by row."""
+        rows = row_ids.tolist()
+        columns = {}
+        for field in fields:
+            if field == 'id':
+                columns[field] = rows
+            elif field == 'complexity':
+                columns[field] = [store.complexity_labels[code] for code in store.complexity_codes[row_ids].tolist()]
+            elif field == 'ingredients':
+                columns[field] = [store.text.ingredients(row_id) for row_id in rows]
+            elif field == 'directions':
+                columns[field] = [store.text.steps(row_id) for row_id in rows]
+            elif field in FRAME_FIELDS:
+                columns[field] = store.df[field].to_numpy()[row_ids].tolist()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())] if rows else []
+
+    def ingredients(self, params):
+        limit = _int_param(params, 'limit', 20, 1, MAX_SUGGESTIONS)
+        return {'ingredients': self.engine.store().search.complete(params.get('q', ''), limit)}
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 front end: parses requests on the event loop, answers them on the pool."""
+
+    def __init__(self, api, workers=None):
+        self.api = api
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='recipe-api')
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, *RecipeApi._json(400, {'error': 'malformed request line'}), False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    length = _content_length(headers)
+                except ApiError as error:
+                    # The body cannot be skipped reliably, so the connection is closed after the answer
+                    metrics.increment('api_client_errors')
+                    await self._respond(writer, *RecipeApi._json(error.status, {'error': str(error)}), False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                with metrics.timer('api_request_seconds'):
+                    response = await asyncio.get_running_loop().run_in_executor(
+                        self.pool, self.api.handle, method, target, body
+                    )
+                metrics.increment('api_requests')
+                await self._respond(writer, *response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, content_type, body, keep_alive):
+        writer.write(
+            f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1') + body
+        )
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info('Serving recipes on http://%s:%s', host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the recipe filter as an HTTP/JSON API.')
+    parser.add_argument('csv_path', nargs='?', default=DEFAULT_DATA_PATH)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 1), help='request threads')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    # Same build options as the app, so both use the same artifact
+    engine = RecipeEngine(args.csv_path, DEFAULT_OPTIONS)
+    store = engine.store()
+    logger.info('Loaded %s recipes (%s)', f'{len(store):,}', store.version)
+    try:
+        asyncio.run(ApiServer(RecipeApi(engine), args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
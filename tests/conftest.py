@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# The recipe_engine package, the CLIs and benchmarks live one directory up
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_catalog import catalog_path  # noqa: E402
+from recipe_engine.dataset_cache import DatasetOptions, load_dataset  # noqa: E402
+from recipe_engine.recipe_complexity import DEFAULT_BANDING  # noqa: E402
+from tests.reference import load_data  # noqa: E402
+
+# Small enough to build in seconds, large enough for long and short posting lists
+CATALOG_RECIPES = 3000
+
+# The original filter matched raw ingredient strings, so equivalence is checked without normalization
+RAW_OPTIONS = DatasetOptions(DEFAULT_BANDING, False)
+
+
+@pytest.fixture(scope='session')
+def catalog_csv(tmp_path_factory):
+    return catalog_path(str(tmp_path_factory.mktemp('catalog')), CATALOG_RECIPES, seed=7)
+
+
+@pytest.fixture(scope='session')
+def raw_dataset(catalog_csv, tmp_path_factory):
+    return load_dataset(catalog_csv, str(tmp_path_factory.mktemp('cache')), RAW_OPTIONS)
+
+
+@pytest.fixture(scope='session')
+def reference_frame(catalog_csv):
+    return load_data(catalog_csv)[0]
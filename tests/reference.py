@@ -0,0 +1,80 @@
+import pandas as pd
+
+# -------------------------------------------------
+# Reference Implementation
+# -------------------------------------------------
+# load_data and filter_recipes as the app shipped them before the index, minus
+# the Streamlit caching and messages. Every faster path must return exactly
+# the recipes these return.
+
+
+def load_data(path):
+    """Loads and preprocesses the recipe data."""
+    df = pd.read_csv(path)
+
+    q1 = df['num_steps'].quantile(0.25)
+    q3 = df['num_steps'].quantile(0.75)
+
+    def get_complexity(steps):
+        if steps <= q1:
+            return 'Simple'
+        elif steps <= q3:
+            return 'Medium'
+        else:
+            return 'Complex'
+
+    df['Complexity'] = df['num_steps'].apply(get_complexity)
+
+    if 'cleaned_ingredients_filtered' in df.columns:
+        all_ingredients_list = df['cleaned_ingredients_filtered'].astype(str).str.lower().str.split(', ').explode().dropna().unique()
+        all_ingredients_set = set(all_ingredients_list)
+        all_ingredients_set.discard('')
+    else:
+        all_ingredients_set = set()
+
+    all_categories = sorted(list(df['category'].unique()))
+
+    return df, sorted(list(all_ingredients_set)), all_categories
+
+
+def filter_recipes(df, selected_ingredients, keywords, threshold_percent, selected_category):
+    """Filters the recipes based on selected category, ingredients, keywords, and match threshold."""
+
+    if not selected_ingredients and selected_category == 'All Categories' and threshold_percent > 0:
+        return df.head(0)
+
+    filtered_df = df.copy()
+    threshold = threshold_percent / 100.0
+    is_strict_match = (threshold_percent == 100) and (selected_ingredients)
+
+    if selected_category != 'All Categories':
+        filtered_df = filtered_df[filtered_df['category'] == selected_category].copy()
+
+    if filtered_df.empty:
+        return filtered_df.head(0)
+
+    if selected_ingredients:
+        recipe_ingredients = filtered_df['cleaned_ingredients_filtered'].fillna('').astype(str).str.lower().str.split(', ')
+        filtered_df['recipe_ing_count'] = recipe_ingredients.apply(lambda x: len([i for i in x if i and i != '']))
+
+        def calculate_match_score(recipe_ing_list):
+            if not selected_ingredients:
+                return 1.0
+
+            cleaned_recipe_ing_list = set([i for i in recipe_ing_list if i and i != ''])
+
+            if not cleaned_recipe_ing_list:
+                return 0
+
+            matched_count = len(set(selected_ingredients) & cleaned_recipe_ing_list)
+            return matched_count / len(selected_ingredients)
+
+        filtered_df['match_score'] = recipe_ingredients.apply(calculate_match_score)
+
+        filtered_df = filtered_df[filtered_df['match_score'] >= threshold].copy()
+
+        if is_strict_match:
+            num_selected = len(selected_ingredients)
+            filtered_df = filtered_df[filtered_df['recipe_ing_count'] == num_selected].copy()
+
+    return filtered_df.drop(columns=['match_score', 'recipe_ing_count'], errors='ignore')
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from build_index import build_sharded
+from recipe_engine.dataset_cache import DEFAULT_OPTIONS, build_dataset
+from tests.conftest import RAW_OPTIONS
+
+
+class QuietProgress:
+    def update(self, message):
+        pass
+
+    def stage(self, name, rows):
+        pass
+
+
+@pytest.mark.parametrize('options', [DEFAULT_OPTIONS, RAW_OPTIONS], ids=['normalized', 'raw'])
+def test_sharded_build_equals_in_process_build(catalog_csv, options):
+    expected = build_dataset(catalog_csv, options)
+    sharded = build_sharded(catalog_csv, options, workers=2, chunk_rows=700, shard_rows=450, progress=QuietProgress())
+
+    df, all_ingredients, all_categories, index, text, keywords, stats = sharded
+    pd.testing.assert_frame_equal(df, expected[0])
+    assert all_ingredients == expected[1]
+    assert all_categories == expected[2]
+    assert index.vocabulary == expected[3].vocabulary
+    assert index.raw_vocabulary == expected[3].raw_vocabulary
+    for name in ('offsets', 'postings', 'token_counts', 'raw_to_canonical', 'category_codes'):
+        assert np.array_equal(getattr(index, name), getattr(expected[3], name)), name
+    assert (index.matrix != expected[3].matrix).nnz == 0
+    for name, values in text.arrays().items():
+        assert np.array_equal(values, expected[4].arrays()[name]), name
+    assert keywords.terms == expected[5].terms
+    for name, values in keywords.arrays().items():
+        assert np.array_equal(values, expected[5].arrays()[name]), name
+    assert stats == expected[6]
@@ -0,0 +1,59 @@
+import threading
+
+from recipe_engine.favorites_store import FavoritesStore, load_favorites
+
+
+def test_titles_keep_insertion_order(tmp_path):
+    store = FavoritesStore(str(tmp_path / 'favorites.sqlite'))
+    for title in ('Soup', 'Apple Pie', 'Zucchini Bread'):
+        assert store.add(title)
+    assert store.titles() == ['Soup', 'Apple Pie', 'Zucchini Bread']
+
+    assert store.remove('Apple Pie')
+    assert not store.remove('Apple Pie')
+    store.add('Apple Pie')
+    assert store.titles() == ['Soup', 'Zucchini Bread', 'Apple Pie']
+
+
+def test_duplicates_are_ignored(tmp_path):
+    store = FavoritesStore(str(tmp_path / 'favorites.sqlite'))
+    assert store.add('Soup')
+    assert not store.add('Soup')
+    store.add_many(['Salad', 'Soup', 'Salad', 'Stew'])
+    assert store.titles() == ['Soup', 'Salad', 'Stew']
+
+
+def test_profiles_are_separate_and_persisted(tmp_path):
+    path = str(tmp_path / 'nested' / 'favorites.sqlite')
+    store = FavoritesStore(path)
+    store.add_many(['Soup', 'Stew'], profile='alex')
+    store.add('Cake', profile='sam')
+    store.remove('Soup', profile='sam')
+
+    reopened = FavoritesStore(path)
+    assert reopened.titles('alex') == ['Soup', 'Stew']
+    assert reopened.titles('sam') == ['Cake']
+    assert reopened.titles() == []
+
+
+def test_concurrent_adds(tmp_path):
+    store = FavoritesStore(str(tmp_path / 'favorites.sqlite'))
+
+    def add(worker):
+        for i in range(50):
+            store.add(f'Recipe {i % 25}')
+            store.add_many([f'Batch {worker} {i}'])
+
+    threads = [threading.Thread(target=add, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    titles = store.titles()
+    assert len(titles) == len(set(titles)) == 25 + 4 * 50
+
+
+def test_load_favorites_skips_missing_titles(tmp_path):
+    store = FavoritesStore(str(tmp_path / 'favorites.sqlite'))
+    store.add_many(['Stew', 'Gone', 'Soup'])
+    assert list(load_favorites(store, {'Soup': 3, 'Stew': 8})) == [8, 3]
@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+
+from recipe_engine.incremental_query import IncrementalQuery
+from recipe_engine.recipe_index import ALL_CATEGORIES
+from recipe_engine.recipe_ranking import rank_top_k
+from tests.reference import filter_recipes
+
+REFINEMENT_STEPS = 3000
+
+
+def test_refinements_match_full_queries(raw_dataset, reference_frame):
+    """A session adding and removing ingredients one at a time gets the same rows as a fresh query."""
+    index = raw_dataset.index
+    codes = np.asarray(raw_dataset.df['Complexity'].cat.codes)
+    levels = len(raw_dataset.df['Complexity'].cat.categories)
+    titles = raw_dataset.df['recipe_title'].to_numpy()
+    matcher = IncrementalQuery(index)
+    rng = random.Random(2)
+    vocabulary = list(raw_dataset.all_ingredients) + ['no such ingredient']
+    categories = [ALL_CATEGORIES] + list(raw_dataset.all_categories) + ['No such category']
+
+    selected = []
+    for step in range(REFINEMENT_STEPS):
+        action = rng.random()
+        if action < 0.35 and len(selected) < 8:
+            selected = selected + [rng.choice(vocabulary)]
+        elif action < 0.6 and selected:
+            selected = [name for name in selected if name != rng.choice(selected)]
+        threshold, category = rng.choice([0, 5, 25, 50, 75, 100]), rng.choice(categories)
+
+        rows = matcher.query(selected, threshold, category)
+        assert np.array_equal(rows, index.query(selected, threshold, category)), (step, selected, threshold, category)
+
+        if step % 10 == 0 and selected:
+            expected = rank_top_k(index, codes, levels, selected, threshold, category, 20)
+            ranked = rank_top_k(index, codes, levels, selected, threshold, category, 20, matcher=matcher)
+            assert np.array_equal(ranked[0], expected[0])
+            assert np.array_equal(ranked[1], expected[1])
+        if step % 100 == 0:
+            reference = filter_recipes(reference_frame, selected, '', threshold, category)
+            assert sorted(titles[rows].tolist()) == sorted(reference['recipe_title'].tolist())
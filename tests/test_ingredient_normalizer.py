@@ -0,0 +1,85 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from recipe_engine.ingredient_normalizer import IngredientNormalizer, edit_distance, singularize
+from recipe_engine.recipe_index import INGREDIENT_COLUMN, IngredientIndex
+
+
+@pytest.mark.parametrize('word, singular', [
+    ('tomatoes', 'tomato'), ('berries', 'berry'), ('leaves', 'leaf'), ('dishes', 'dish'), ('boxes', 'box'),
+    ('eggs', 'egg'), ('molasses', 'molasses'), ('hummus', 'hummus'), ('glass', 'glass'), ('peas', 'pea'),
+    ('gas', 'gas'), ('7up', '7up'), ('cookies', 'cookie'),
+])
+def test_singularize(word, singular):
+    assert singularize(word) == singular
+
+
+@pytest.mark.parametrize('raw, form', [
+    ('Roma  Tomatoes', 'tomato'),
+    ('scallions', 'green onion'),
+    ("Confectioners' Sugar", 'powdered sugar'),
+    ('extra-virgin olive oil', 'olive oil'),
+    ('garbanzo beans', 'chickpea'),
+    ('red onions', 'red onion'),
+    ('white chocolate chips', 'white chocolate chip'),
+])
+def test_canonical_form(raw, form):
+    assert IngredientNormalizer().canonical_form(raw) == form
+
+
+def test_edit_distance_stops_at_limit():
+    assert edit_distance('tomato', 'tomatoe', 2) == 1
+    assert edit_distance('basil', 'basl', 2) == 1
+    assert edit_distance('tomato', 'potato', 2) == 2
+    assert edit_distance('salt', 'chocolate chip', 2) == 3
+
+
+def test_only_misspellings_are_folded():
+    raw_vocabulary = ['chocolate chip', 'chocolate chips', 'corriander', 'coriander', 'tomatoe', 'tomatoes',
+                      'white chocolate chip']
+    raw_counts = [40, 3, 1, 25, 1, 60, 1]
+    vocabulary, raw_to_canonical = IngredientNormalizer().build_mapping(raw_vocabulary, raw_counts)
+    mapped = {raw: vocabulary[code] for raw, code in zip(raw_vocabulary, raw_to_canonical)}
+    assert mapped == {
+        'chocolate chip': 'chocolate chip', 'chocolate chips': 'chocolate chip',
+        'corriander': 'coriander', 'coriander': 'coriander',
+        'tomatoe': 'tomato', 'tomatoes': 'tomato',
+        # An added word is a different ingredient, not a typo
+        'white chocolate chip': 'white chocolate chip',
+    }
+
+
+@pytest.fixture
+def index():
+    df = pd.DataFrame({
+        'category': ['Desserts', 'Salads', 'Salads'],
+        INGREDIENT_COLUMN: ['chocolate chips, butter', 'tomatoes, basil, scallions', 'tomato, olive oil'],
+    })
+    return IngredientIndex.build(df, IngredientNormalizer())
+
+
+def test_resolve_names(index):
+    ids = index.ingredient_ids
+    assert index.resolve('tomatoes') == ids['tomato']
+    assert index.resolve('Spring Onions') == ids['green onion']
+    assert index.resolve('chocolate chipp') == ids['chocolate chip']
+    assert index.resolve('white chocolate chip') is None
+    assert index.resolve('saffron') is None
+
+
+def test_concurrent_fuzzy_resolution_builds_once(index):
+    results, barrier = [], threading.Barrier(8)
+
+    def resolve():
+        barrier.wait()
+        results.append((index.resolve('olive oill'), index._fuzzy))
+
+    threads = [threading.Thread(target=resolve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert {name_id for name_id, _ in results} == {index.ingredient_ids['olive oil']}
+    assert len({id(fuzzy) for _, fuzzy in results}) == 1
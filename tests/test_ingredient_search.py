@@ -0,0 +1,41 @@
+import numpy as np
+
+from recipe_engine.ingredient_search import IngredientSearch
+
+VOCABULARY = ['brown sugar', 'butter', 'buttermilk', 'green onion', 'onion', 'peanut butter', 'salt', 'sugar']
+FREQUENCIES = [30, 80, 10, 20, 60, 5, 100, 80]
+
+
+def search():
+    return IngredientSearch(VOCABULARY, FREQUENCIES)
+
+
+def test_word_prefixes_most_used_first():
+    assert search().complete('but') == ['butter', 'buttermilk', 'peanut butter']
+    assert search().complete('onion') == ['onion', 'green onion']
+    assert search().complete('SUG') == ['sugar', 'brown sugar']
+
+
+def test_every_word_must_match():
+    assert search().complete('butter pea') == ['peanut butter']
+    assert search().complete('brown su') == ['brown sugar']
+    assert search().complete('brown salt') == []
+    assert search().complete('xyz') == []
+
+
+def test_empty_text_lists_the_most_used():
+    assert search().complete('', limit=3) == ['salt', 'butter', 'sugar']
+    assert search().complete('   ', limit=2) == ['salt', 'butter']
+
+
+def test_limit_and_ties_by_vocabulary_order():
+    assert search().complete('s', limit=2) == ['salt', 'sugar']
+    assert search().complete('b', limit=10) == ['butter', 'brown sugar', 'buttermilk', 'peanut butter']
+
+
+def test_from_index_ranks_by_recipe_count(raw_dataset):
+    index = raw_dataset.index
+    completions = IngredientSearch.from_index(index).complete('', limit=10)
+    counts = np.diff(index.offsets)
+    expected = sorted(range(len(counts)), key=lambda i: (-counts[i], i))[:10]
+    assert completions == [index.vocabulary[i] for i in expected]
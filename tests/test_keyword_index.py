@@ -0,0 +1,115 @@
+import math
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from recipe_engine import RecipeEngine
+from recipe_engine.keyword_index import (
+    BM25_B, BM25_K1, TITLE_WEIGHT, KeywordIndex, contains_sorted, intersect_sorted, keyword_terms,
+)
+from recipe_engine.recipe_index import ALL_CATEGORIES
+from tests.conftest import RAW_OPTIONS
+
+
+@pytest.fixture(scope='module')
+def documents(raw_dataset):
+    """Term counts of every recipe, built the slow way: title terms TITLE_WEIGHT times plus every step."""
+    titles = raw_dataset.df['recipe_title'].tolist()
+    counts = []
+    for row, title in enumerate(titles):
+        terms = keyword_terms(title) * TITLE_WEIGHT
+        for step in raw_dataset.text.steps(row):
+            terms.extend(keyword_terms(step))
+        counts.append(Counter(terms))
+    return counts
+
+
+def brute_force(documents, query):
+    terms = set(keyword_terms(query))
+    lengths = np.array([sum(counts.values()) for counts in documents], dtype=float)
+    average = lengths.mean()
+    rows = [row for row, counts in enumerate(documents) if all(counts[term] for term in terms)]
+    scores = []
+    for row in rows:
+        score = 0.0
+        for term in terms:
+            containing = sum(1 for counts in documents if counts[term])
+            idf = math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+            frequency = documents[row][term]
+            score += idf * frequency * (BM25_K1 + 1) / (
+                frequency + BM25_K1 * (1 - BM25_B + BM25_B * lengths[row] / average))
+        scores.append(score)
+    return np.array(rows, dtype=np.int64), np.array(scores)
+
+
+def queries(raw_dataset):
+    rng = random.Random(4)
+    terms = list(raw_dataset.keywords.terms)
+    common = [raw_dataset.keywords.terms[i] for i in np.argsort(-np.diff(raw_dataset.keywords.offsets))[:30]]
+    picked = ['Recipes', 'the boiled EGGS', 'no-such-word', raw_dataset.df['recipe_title'].iloc[17]]
+    for _ in range(12):
+        picked.append(' '.join(rng.sample(common, rng.randint(1, 3)) + rng.sample(terms, rng.randint(0, 1))))
+    return picked
+
+
+def test_keyword_terms():
+    assert keyword_terms('The Tomatoes, and 2 EGGS!') == ['tomato', '2', 'egg']
+    assert keyword_terms('the and of') == []
+
+
+def test_sorted_helpers():
+    values = np.array([1, 4, 9, 12], dtype=np.int32)
+    assert contains_sorted(np.array([0, 4, 12, 13]), values).tolist() == [False, True, True, False]
+    assert not contains_sorted(values, np.empty(0, dtype=np.int32)).any()
+    assert intersect_sorted(values, np.arange(0, 10, 2)).tolist() == [4]
+
+
+def test_search_matches_brute_force(raw_dataset, documents):
+    keywords = raw_dataset.keywords
+    assert keywords.search('the of and') is None
+    for query in queries(raw_dataset):
+        rows, scores = keywords.search(query)
+        expected_rows, expected_scores = brute_force(documents, query)
+        assert np.array_equal(rows, expected_rows), query
+        assert np.allclose(scores, expected_scores), query
+
+
+def test_concat_of_parts_equals_one_build(raw_dataset):
+    titles = raw_dataset.df['recipe_title']
+    whole = KeywordIndex.build(titles, raw_dataset.text, chunk_rows=700)
+    bounds = [0, 1, 900, 2100, len(titles)]
+    parts = []
+    for start, stop in zip(bounds, bounds[1:]):
+        part_text = type(raw_dataset.text).build(raw_dataset.df.iloc[start:stop])
+        parts.append(KeywordIndex.build(titles.iloc[start:stop], part_text))
+    joined = KeywordIndex.concat(parts)
+    assert joined.terms == whole.terms
+    for name, values in whole.arrays().items():
+        assert np.array_equal(joined.arrays()[name], values), name
+
+
+@pytest.fixture(scope='module')
+def engine(catalog_csv, tmp_path_factory):
+    favorites = str(tmp_path_factory.mktemp('favorites') / 'favorites.sqlite')
+    return RecipeEngine(catalog_csv, RAW_OPTIONS, favorites_path=favorites, watch=False)
+
+
+@pytest.mark.parametrize('threshold', [0, 50])
+@pytest.mark.parametrize('category', [ALL_CATEGORIES, 'Desserts'])
+def test_keywords_intersect_ingredient_results(raw_dataset, engine, threshold, category):
+    store = engine.store()
+    names = list(store.all_ingredients[:2])
+    for query in queries(raw_dataset)[:8]:
+        rows, scores = store.keywords.search(query)
+        for ingredients in ([], names):
+            allowed = (store.index.query(ingredients, threshold, category) if ingredients
+                       else store.index.rows_in_category(category))
+            keep = np.isin(rows, allowed)
+            result = engine.filter(ingredients, threshold, category, keywords=query)
+            assert np.array_equal(result, rows[keep]), (query, ingredients)
+
+            ranked = engine.filter(ingredients, threshold, category, top_k=5, keywords=query)
+            order = np.lexsort((rows[keep], -scores[keep]))[:5]
+            assert np.array_equal(ranked, rows[keep][order]), (query, ingredients)
@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+import pytest
+
+from recipe_engine.pantry_batch import score_pantries
+from recipe_engine.recipe_index import ALL_CATEGORIES
+from recipe_engine.recipe_ranking import rank_top_k
+from tests.reference import filter_recipes
+
+NUM_PANTRIES = 700
+TOP_K = 10
+
+
+@pytest.fixture(scope='module')
+def pantries(raw_dataset):
+    """Mostly popular ingredients, some rare ones, empty pantries and unknown names."""
+    rng = random.Random(1)
+    index = raw_dataset.index
+    vocabulary = list(index.vocabulary)
+    popular = [vocabulary[i] for i in np.argsort(-np.diff(index.offsets))[:80]]
+    pantries = []
+    for _ in range(NUM_PANTRIES):
+        pantry = rng.sample(popular, rng.randint(1, 8)) + (rng.sample(vocabulary, 2) if rng.random() < 0.5 else [])
+        if rng.random() < 0.05:
+            pantry = []
+        if rng.random() < 0.05:
+            pantry.append('no such ingredient')
+        pantries.append(pantry)
+    return pantries
+
+
+def complexity(dataset):
+    return np.asarray(dataset.df['Complexity'].cat.codes), len(dataset.df['Complexity'].cat.categories)
+
+
+@pytest.mark.parametrize('threshold', [0, 25, 50, 75, 100])
+@pytest.mark.parametrize('category', [ALL_CATEGORIES, 'Desserts', 'No such category'])
+def test_batch_matches_single_queries(raw_dataset, pantries, threshold, category):
+    index = raw_dataset.index
+    codes, levels = complexity(raw_dataset)
+    results = score_pantries(index, codes, levels, pantries, threshold, category, k=TOP_K, block_size=97)
+    for pantry, count, top_ids, top_scores in zip(pantries, results.counts, results.top_ids, results.top_scores):
+        assert count == len(index.query(pantry, threshold, category)), pantry
+        best, scores = rank_top_k(index, codes, levels, pantry, threshold, category, TOP_K)
+        found = top_ids[top_ids >= 0]
+        assert np.array_equal(found, best), pantry
+        assert np.array_equal(top_scores[:len(found)], scores), pantry
+
+
+def test_batch_counts_match_filter_recipes(raw_dataset, reference_frame, pantries):
+    codes, levels = complexity(raw_dataset)
+    results = score_pantries(raw_dataset.index, codes, levels, pantries[:150], 50, ALL_CATEGORIES, k=TOP_K)
+    for pantry, count in zip(pantries[:150], results.counts.tolist()):
+        assert count == len(filter_recipes(reference_frame, pantry, '', 50, ALL_CATEGORIES)), pantry
+
+
+def test_worker_processes_give_the_same_results(raw_dataset, pantries):
+    codes, levels = complexity(raw_dataset)
+    single = score_pantries(raw_dataset.index, codes, levels, pantries, 50, ALL_CATEGORIES, k=TOP_K, block_size=97)
+    pooled = score_pantries(
+        raw_dataset.index, codes, levels, pantries, 50, ALL_CATEGORIES, k=TOP_K, workers=2, block_size=97
+    )
+    assert np.array_equal(single.counts, pooled.counts)
+    assert np.array_equal(single.top_ids, pooled.top_ids)
+    assert np.array_equal(single.top_scores, pooled.top_scores, equal_nan=True)
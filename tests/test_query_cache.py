@@ -0,0 +1,53 @@
+import numpy as np
+
+from recipe_engine.query_cache import QueryCache, normalize_query
+
+
+def key(version, name):
+    return normalize_query(version, [name], 50, 'All Categories')
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_entries=3)
+    for name in ('a', 'b', 'c'):
+        cache.put(key('v1', name), name)
+    assert cache.get(key('v1', 'a')) == 'a'
+    cache.put(key('v1', 'd'), 'd')
+    assert cache.get(key('v1', 'b')) is None
+    assert [cache.get(key('v1', name)) for name in ('a', 'c', 'd')] == ['a', 'c', 'd']
+
+    cache.put(key('v1', 'c'), 'c again')
+    cache.put(key('v1', 'e'), 'e')
+    assert cache.get(key('v1', 'a')) is None
+    assert cache.get(key('v1', 'c')) == 'c again'
+    assert cache.stats()['entries'] == 3
+
+
+def test_drop_version_keeps_other_versions():
+    cache = QueryCache()
+    for version in ('v1', 'v2'):
+        for name in ('a', 'b'):
+            cache.put(key(version, name), (version, name))
+    cache.drop_version('v1')
+    assert cache.get(key('v1', 'a')) is None and cache.get(key('v1', 'b')) is None
+    assert cache.get(key('v2', 'a')) == ('v2', 'a')
+    assert cache.stats()['entries'] == 2
+
+
+def test_stats_count_hits_and_misses():
+    cache = QueryCache()
+    cache.put(key('v1', 'a'), 1)
+    cache.get(key('v1', 'a'))
+    cache.get(key('v1', 'b'))
+    cache.get(key('v1', 'a'))
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert np.isclose(stats['hit_rate'], 2 / 3)
+
+
+def test_equivalent_queries_share_a_key():
+    assert normalize_query('v', ['salt', 'eggs'], 50.0, 'Soups', None, 'Roasted  tomatoes') == \
+        normalize_query('v', ['eggs', 'salt'], 50, 'Soups', 0, 'the tomato roasted')
+    assert normalize_query('v', ['salt'], 50, 'Soups') != normalize_query('v', ['salt'], 55, 'Soups')
+    assert normalize_query('v', ['salt'], 50, 'Soups', 10) != normalize_query('v', ['salt'], 50, 'Soups')
+    assert normalize_query('v1', ['salt'], 50, 'Soups') != normalize_query('v2', ['salt'], 50, 'Soups')
@@ -0,0 +1,79 @@
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recipe_engine.perf_metrics import metrics
+from recipe_engine.recipe_export import EXPORT_FORMATS, export_file, write_export
+
+
+@pytest.fixture(scope='module')
+def frame(raw_dataset):
+    return raw_dataset.df.drop(columns=['Complexity'])
+
+
+def read_back(data, export_format):
+    if export_format == 'CSV':
+        return pd.read_csv(io.BytesIO(data), keep_default_na=False)
+    if export_format == 'JSON Lines':
+        return pd.read_json(io.BytesIO(data), lines=True)
+    return pd.read_parquet(io.BytesIO(data))
+
+
+def exported(df, row_ids, export_format, chunk_rows):
+    handle = io.BytesIO()
+    write_export(handle, df, row_ids, export_format, chunk_rows=chunk_rows)
+    return handle.getvalue()
+
+
+@pytest.mark.parametrize('export_format', list(EXPORT_FORMATS))
+def test_chunked_export_round_trips(frame, export_format):
+    row_ids = np.random.default_rng(5).choice(len(frame), 1234, replace=False).astype(np.int32)
+    expected = frame.iloc[row_ids].reset_index(drop=True)
+    back = read_back(exported(frame, row_ids, export_format, chunk_rows=100), export_format)
+    assert back['recipe_title'].astype(str).tolist() == expected['recipe_title'].astype(str).tolist()
+    assert back['num_steps'].tolist() == expected['num_steps'].tolist()
+    assert list(back.columns) == list(frame.columns)
+
+
+@pytest.mark.parametrize('export_format', list(EXPORT_FORMATS))
+def test_whole_frame_is_one_chunk_stream(frame, export_format):
+    """Several chunks and one big chunk encode the same rows (one CSV header, no blank JSON lines)."""
+    chunked = read_back(exported(frame, None, export_format, chunk_rows=333), export_format)
+    whole = read_back(exported(frame, None, export_format, chunk_rows=len(frame)), export_format)
+    pd.testing.assert_frame_equal(chunked, whole)
+    assert len(chunked) == len(frame)
+
+
+def test_empty_result_keeps_header(frame):
+    empty = np.empty(0, dtype=np.int32)
+    csv = exported(frame, empty, 'CSV', chunk_rows=100).decode('utf-8')
+    assert csv.strip() == ','.join(frame.columns)
+    assert exported(frame, empty, 'JSON Lines', chunk_rows=100) == b''
+    parquet = pd.read_parquet(io.BytesIO(exported(frame, empty, 'Parquet', chunk_rows=100)))
+    assert len(parquet) == 0 and list(parquet.columns) == list(frame.columns)
+
+
+def test_export_is_written_once_per_key(frame, tmp_path):
+    row_ids = np.arange(500, dtype=np.int32)
+    misses = metrics.counters.get('export_cache_misses', 0)
+    paths = []
+
+    def download():
+        paths.append(export_file(str(tmp_path), 'v1', ('salt',), frame, row_ids, 'CSV'))
+
+    threads = [threading.Thread(target=download) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(paths)) == 1
+    assert metrics.counters['export_cache_misses'] == misses + 1
+    with open(paths[0], 'rb') as handle:
+        assert len(read_back(handle.read(), 'CSV')) == len(row_ids)
+
+    other = export_file(str(tmp_path), 'v1', ('sugar',), frame, row_ids, 'CSV')
+    assert other != paths[0]
+    assert metrics.counters['export_cache_misses'] == misses + 2
@@ -0,0 +1,31 @@
+import random
+
+import numpy as np
+
+from recipe_engine.recipe_index import ALL_CATEGORIES
+from tests.reference import filter_recipes
+
+THRESHOLDS = (0, 5, 25, 50, 75, 100)
+
+
+def random_queries(dataset, count, seed):
+    """(selected, threshold, category) mixes, including unknown names and categories."""
+    rng = random.Random(seed)
+    vocabulary = list(dataset.all_ingredients) + ['no such ingredient']
+    categories = [ALL_CATEGORIES] + list(dataset.all_categories) + ['No such category']
+    return [
+        (rng.sample(vocabulary, rng.randint(0, 5)), rng.choice(THRESHOLDS), rng.choice(categories))
+        for _ in range(count)
+    ]
+
+
+def test_query_matches_filter_recipes(raw_dataset, reference_frame):
+    titles = raw_dataset.df['recipe_title'].to_numpy()
+    for selected, threshold, category in random_queries(raw_dataset, 300, seed=1):
+        rows = raw_dataset.index.query(selected, threshold, category)
+        expected = filter_recipes(reference_frame, selected, '', threshold, category)
+        assert sorted(titles[rows].tolist()) == sorted(expected['recipe_title'].tolist()), \
+            (selected, threshold, category)
+        # Rows are stored in complexity order, so ascending positions are the display order
+        assert np.all(np.diff(rows) > 0)
+
@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from recipe_engine.recipe_index import ALL_CATEGORIES
+from recipe_engine.recipe_ranking import DEFAULT_WEIGHTS, rank_top_k, simplicity
+
+
+def complexity(dataset):
+    return np.asarray(dataset.df['Complexity'].cat.codes), len(dataset.df['Complexity'].cat.categories)
+
+
+def brute_force(index, codes, levels, selected, threshold, category, k, weights=DEFAULT_WEIGHTS):
+    """Scores every qualifying recipe and sorts them all (best first, ties by row)."""
+    ingredient_ids, num_selected = index.resolve_query(selected)
+    counts = np.asarray(index.matrix @ index.query_vector(ingredient_ids))
+    rows = index.query(selected, threshold, category)
+    scores = (
+        weights.match * counts[rows] / max(num_selected, 1)
+        + weights.coverage * counts[rows] / np.maximum(index.token_counts[rows], 1)
+        + weights.simplicity * simplicity(codes, rows, levels)
+    )
+    order = np.lexsort((rows, -scores))[:k]
+    return rows[order], scores[order]
+
+
+def selections(index):
+    """A single very common ingredient (one huge bucket), popular mixes, rare ones and unknown names."""
+    rng = random.Random(3)
+    vocabulary = list(index.vocabulary)
+    by_frequency = [vocabulary[i] for i in np.argsort(-np.diff(index.offsets))]
+    picked = [[by_frequency[0]], by_frequency[:3], by_frequency[-2:]]
+    for _ in range(25):
+        selection = rng.sample(by_frequency[:60], rng.randint(1, 7)) + rng.sample(vocabulary, rng.randint(0, 2))
+        if rng.random() < 0.2:
+            selection.append('no such ingredient')
+        picked.append(selection)
+    return picked
+
+
+@pytest.mark.parametrize('k', [1, 10, 250, 10_000])
+@pytest.mark.parametrize('threshold', [0, 30, 50, 100])
+@pytest.mark.parametrize('category', [ALL_CATEGORIES, 'Desserts'])
+def test_top_k_matches_full_sort(raw_dataset, k, threshold, category):
+    index = raw_dataset.index
+    codes, levels = complexity(raw_dataset)
+    for selected in selections(index):
+        rows, scores = rank_top_k(index, codes, levels, selected, threshold, category, k)
+        expected_rows, expected_scores = brute_force(index, codes, levels, selected, threshold, category, k)
+        assert np.array_equal(rows, expected_rows), selected
+        assert np.allclose(scores, expected_scores, rtol=0, atol=1e-12), selected
+
+
+def test_ties_keep_row_order(raw_dataset):
+    """A single ingredient puts every candidate in one bucket full of equal scores."""
+    index = raw_dataset.index
+    codes, levels = complexity(raw_dataset)
+    common = index.vocabulary[int(np.argmax(np.diff(index.offsets)))]
+    rows, scores = rank_top_k(index, codes, levels, [common], 50, ALL_CATEGORIES, 50)
+    assert len(np.unique(scores)) < len(scores)
+    for score in np.unique(scores):
+        assert np.all(np.diff(rows[scores == score]) > 0)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import pytest
+
+from recipe_engine import RecipeEngine
+from serve_api import MAX_BODY_BYTES, ApiServer, RecipeApi
+from tests.conftest import RAW_OPTIONS
+
+
+@pytest.fixture(scope='module')
+def api(catalog_csv, tmp_path_factory):
+    favorites = str(tmp_path_factory.mktemp('favorites') / 'favorites.sqlite')
+    return RecipeApi(RecipeEngine(catalog_csv, RAW_OPTIONS, favorites_path=favorites, watch=False))
+
+
+def call(api, method, target, body=b''):
+    status, content_type, payload = api.handle(method, target, body)
+    return status, json.loads(payload) if content_type == 'application/json' else payload.decode()
+
+
+def test_recipes_get_and_post_agree(api):
+    store = api.engine.store()
+    names = list(store.all_ingredients[:3])
+    status, by_get = call(api, 'GET', f'/recipes?ingredients={",".join(names)}&threshold=30&page_size=7&page=2')
+    assert status == 200
+    body = json.dumps({'ingredients': names, 'threshold': 30, 'page_size': 7, 'page': 2}).encode()
+    assert call(api, 'POST', '/recipes', body) == (200, by_get)
+
+    assert by_get['total'] == len(api.engine.filter(names, 30, 'All Categories', store=store))
+    assert by_get['pages'] == -(-by_get['total'] // 7)
+    assert len(by_get['results']) <= 7
+    assert set(by_get['results'][0]) == {'id', 'recipe_title', 'category', 'complexity'}
+
+
+def test_recipes_fields_and_ranking(api):
+    store = api.engine.store()
+    name = store.all_ingredients[0]
+    status, payload = call(api, 'GET', f'/recipes?ingredients={name}&top_k=5&fields=id,num_steps,directions')
+    assert status == 200 and payload['ranked'] and payload['total'] <= 5
+    for result in payload['results']:
+        assert set(result) == {'id', 'num_steps', 'directions'}
+        assert result['num_steps'] == int(store.df['num_steps'].iloc[result['id']])
+
+
+@pytest.mark.parametrize('method, target, body', [
+    ('GET', '/recipes?threshold=2.5', b''),
+    ('GET', '/recipes?threshold=abc', b''),
+    ('GET', '/recipes?threshold=101', b''),
+    ('POST', '/recipes', b'{"threshold": 50.9}'),
+    ('POST', '/recipes', b'{"threshold": true}'),
+    ('POST', '/recipes', b'{"page_size": "2.5"}'),
+    ('POST', '/recipes', b'{"top_k": 0}'),
+    ('POST', '/recipes', b'[1, 2]'),
+    ('POST', '/recipes', b'not json'),
+    ('GET', '/recipes?fields=id,secret', b''),
+    ('GET', '/ingredients?limit=1.5', b''),
+])
+def test_invalid_parameters_are_rejected(api, method, target, body):
+    status, payload = call(api, method, target, body)
+    assert status == 400 and payload['error']
+
+
+def test_integral_json_floats_are_accepted(api):
+    assert call(api, 'POST', '/recipes', b'{"threshold": 50.0}')[0] == 200
+
+
+def test_routes(api):
+    store = api.engine.store()
+    status, payload = call(api, 'GET', '/categories')
+    assert status == 200 and payload['categories'][0] == 'All Categories'
+    assert payload['categories'][1:] == list(store.all_categories)
+
+    status, payload = call(api, 'GET', '/ingredients?q=a&limit=3')
+    assert status == 200 and len(payload['ingredients']) <= 3
+
+    status, payload = call(api, 'GET', '/health')
+    assert payload == {'status': 'ok', 'version': store.version, 'recipes': len(store)}
+
+    status, text = call(api, 'GET', '/metrics')
+    assert status == 200 and 'api_client_errors' in text
+
+    assert call(api, 'PUT', '/recipes')[0] == 405
+    assert call(api, 'POST', '/health')[0] == 405
+    assert call(api, 'GET', '/nowhere')[0] == 404
+
+
+def raw_request(api, request):
+    """Status code of the server's answer to raw request bytes."""
+    async def exchange():
+        server = await asyncio.start_server(ApiServer(api, workers=1).handle_connection, '127.0.0.1', 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(request)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), 10)
+            writer.close()
+            return int(status_line.split()[1]) if status_line else None
+
+    return asyncio.run(exchange())
+
+
+@pytest.mark.parametrize('length, status', [
+    ('abc', 400), ('-5', 400), ('1.5', 400), (str(MAX_BODY_BYTES + 1), 413),
+])
+def test_bad_content_length_is_answered(api, length, status):
+    request = f'POST /recipes HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}'.encode()
+    assert raw_request(api, request) == status
+
+
+def test_post_over_http(api):
+    body = b'{"threshold": 0, "page_size": 1}'
+    request = b'POST /recipes HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body)
+    assert raw_request(api, request) == 200
@@ -0,0 +1,73 @@
+import os
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_catalog import catalog_path
+from recipe_engine import RecipeEngine
+from recipe_engine.recipe_index import ALL_CATEGORIES
+from recipe_engine.recipe_store import StoreWatcher, get_store, reload_store
+from tests.conftest import RAW_OPTIONS
+
+WATCH_INTERVAL = 0.05
+SWAP_TIMEOUT = 60
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + SWAP_TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out waiting for the store swap'
+        time.sleep(WATCH_INTERVAL)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """A private copy of a small catalog (the watcher reacts to changes of this file only)."""
+    path = str(tmp_path / 'data' / 'recipes.csv')
+    os.makedirs(os.path.dirname(path))
+    shutil.copy(catalog_path(str(tmp_path / 'source'), 400, seed=11), path)
+    return path
+
+
+def test_unchanged_source_is_not_swapped(catalog):
+    store = get_store(catalog, RAW_OPTIONS)
+    assert reload_store(catalog, RAW_OPTIONS) is store
+    assert get_store(catalog, RAW_OPTIONS) is store
+
+
+def test_changed_csv_swaps_store_and_drops_cached_results(catalog, tmp_path):
+    engine = RecipeEngine(catalog, RAW_OPTIONS, favorites_path=str(tmp_path / 'favorites.sqlite'), watch=False)
+    session = engine.session()
+    old = engine.store()
+    names = list(old.all_ingredients[:2])
+    engine.filter(names, 50, ALL_CATEGORIES)
+    engine.filter([], 0, ALL_CATEGORIES, top_k=5)
+    assert engine.query_cache.stats()['entries'] == 2
+    session.add_favorite(0)
+
+    watcher = StoreWatcher(catalog, RAW_OPTIONS, interval=WATCH_INTERVAL)
+    watcher.start()
+    try:
+        # Replace the CSV atomically with a different catalog
+        replacement = catalog_path(str(tmp_path / 'replacement'), 500, seed=12)
+        staging = catalog + '.tmp'
+        shutil.copy(replacement, staging)
+        os.replace(staging, catalog)
+        wait_for(lambda: get_store(catalog, RAW_OPTIONS) is not old)
+    finally:
+        watcher.stop()
+        watcher.join(timeout=SWAP_TIMEOUT)
+
+    new = engine.store()
+    assert new.version != old.version and len(new) == 500
+    assert engine.query_cache.stats()['entries'] == 0
+
+    # The session keeps its results until its next filter action, then moves over
+    assert session.newer_store_available() and session.store is old
+    rows = session.apply_filters(names, 50, ALL_CATEGORIES)
+    assert session.store is new and not session.newer_store_available()
+    assert np.array_equal(rows, new.index.query(names, 50, ALL_CATEGORIES))
+    # Favorites follow their titles into the new version (or are dropped when gone)
+    assert all(new.titles[row_id] in old.titles for row_id in session.favorites)